@@ -5,9 +5,15 @@ import pandas as pd
 import pytz
 import streamlit as st
 import extra_streamlit_components as stx
-from notion_client import Client
 import hashlib
 
+from notion_dataset import NotionDataset
+from notion_mirror import NotionMirror
+from notion_frames import RIDE_COLUMNS, ColumnarDecoder, format_minutes
+from notion_filters import date_range_filter, month_range, search_filter
+from notion_schema import RIDE_SCHEMA, notion_properties, parse_ride
+from notion_scheduler import ScheduledClient, map_concurrently
+
 
 def setup_page():
     """Configure Streamlit page settings"""
@@ -136,63 +142,165 @@ class NotionService:
         self.notion_token = st.secrets["notion_token"]
         self.datasource_id = st.secrets["datasource_id"]
         self.client = self._get_client()
+        self.mirror = self._get_mirror(self.datasource_id)
+        self.dataset = self._get_dataset(self.datasource_id)
+        # Serve what is cached and refresh it in the background once it is stale; the first
+        # load is left to the foreground streaming sync, which a background one would block
+        if self.dataset.is_ready():
+            self.dataset.revalidate()
 
     @staticmethod
     @st.cache_resource
     def _get_client():
         """Create and cache Notion client"""
         try:
-            return Client(auth=st.secrets["notion_token"])
+            return ScheduledClient(auth=st.secrets["notion_token"])
         except Exception as e:
             st.error(f"Failed to initialize Notion client: {e}")
             return None
 
-    @st.cache_data(ttl=300)
-    def get_rides(_self, month=None):
+    @staticmethod
+    @st.cache_resource
+    def _get_mirror(datasource_id):
+        """Create and cache the local SQLite mirror of the rides data source"""
+        return NotionMirror(NotionService._get_client(), datasource_id, parse_ride,
+                           properties=notion_properties(RIDE_SCHEMA),
+                           auth=st.secrets["notion_token"])
+
+    @staticmethod
+    @st.cache_resource
+    def _get_dataset(datasource_id):
+        """Create and cache the in-memory, Parquet-snapshotted copy of the rides"""
+        return NotionDataset(NotionService._get_mirror(datasource_id), RIDE_SCHEMA, RIDE_COLUMNS,
+                             on_change=NotionService._load_rides.clear)
+
+    @st.cache_resource(ttl=300, max_entries=32)
+    def _load_rides(_self, filter=None, version=None):
+        """
+        Load the rides matching a Notion filter, cached per filter and dataset version.
+
+        Results are shared read-only by every tab and rerun; unlike st.cache_data, returning
+        them makes no copy, so callers must not modify them in place.
+
+        The full history comes from the in-memory dataset, which starts from its Parquet
+        snapshot. Filtered reads are only needed before anything is cached, so they are sent
+        to Notion. Delta syncs run in the background (see NotionDataset.revalidate), so once
+        a snapshot or mirror exists nothing here waits on Notion. Rows are decoded column by
+        column into one typed DataFrame.
+        """
+        decoder = ColumnarDecoder(RIDE_SCHEMA, RIDE_COLUMNS)
+        try:
+            if filter is None:
+                return _self.dataset.frame()
+            for page in _self.mirror.query(filter):
+                decoder.append_page(page)
+        except Exception as e:
+            st.error(f"Error fetching rides: {e}")
+        return decoder.frame()
+
+    def get_rides(self, start=None, end=None, fields=None):
+        """
+        Fetch rides as a typed DataFrame, newest first, with optional date range and field projection.
+
+        Args:
+            start: First date to include (datetime.date). If None, the range is open at the start.
+            end: Last date to include (datetime.date). If None, the range is open at the end.
+            fields: Columns the caller needs besides "id" (e.g., ["date", "amount"]). If None, returns every column.
+        """
+        if self.dataset.is_ready():
+            # Any month or year is a local slice of the full dataset
+            df = self.dataset.select(start, end)
+        else:
+            # Nothing cached yet: query Notion for just this range
+            df = self._load_rides(filter=date_range_filter(start, end), version=self.dataset.version)
+        return df[["id", *fields]] if fields else df
+
+    def search_rides(self, date_from=None, date_to=None, amount_min=None, amount_max=None):
+        """
+        Fetch the rides matching Search & Filter choices as a typed DataFrame, newest first.
+
+        Once the dataset is cached, the date and amount ranges are binary searches over its
+        sorted indexes; before that, the choices are sent to Notion as one filter.
+
+        Args:
+            date_from: First date to include (datetime.date).
+            date_to: Last date to include (datetime.date).
+            amount_min: Smallest amount to include.
+            amount_max: Largest amount to include.
+        """
+        if not self.dataset.is_ready():
+            return self._load_rides(filter=search_filter(date_from, date_to, amount_min, amount_max),
+                                    version=self.dataset.version)
+        return self.dataset.select(date_from, date_to, amount_min, amount_max)
+
+    @st.cache_resource(max_entries=2)
+    def _prepare_rides(_self, version):
+        """Build the display-ready ride history (month, year, formatted date and time, oldest first) for one dataset version"""
+        df = _self.get_rides().drop(columns=["month"])
+        df = df.assign(month=df["date"].dt.strftime("%B"), year=df["date"].dt.year)
+        df = df.sort_values(by=["date", "time"], ascending=True)
+        df = df.assign(time=format_minutes(df["time"]), date_display=df["date"].dt.strftime("%d-%B-%Y"))
+        df.index = range(1, len(df) + 1)
+        return df
+
+    def prepared_rides(self):
+        """
+        Return the display-ready ride history, built once per dataset version and shared read-only
+        by every view instead of being rebuilt on each rerun.
+        """
+        self.dataset.frame()
+        return self._prepare_rides(self.dataset.version)
+
+    def iter_rides(self, start=None, end=None, fields=None):
         """
-        Fetch rides from Notion with optional month filter.
+        Yield rides as typed DataFrame chunks while they are fetched.
+
+        On the first load the mirror is still empty, so each batch of pages is decoded and
+        yielded as soon as Notion returns it. Once the mirror is warm, the cached DataFrame
+        is yielded in one chunk.
 
         Args:
-            month: Filter by month name only (e.g., "January"). If None, fetches all rides.
+            start: First date to include (datetime.date). If None, the range is open at the start.
+            end: Last date to include (datetime.date). If None, the range is open at the end.
+            fields: Columns the caller needs besides "id". If None, yields every column.
         """
-        rides = []
-        has_more = True
-        start_cursor = None
+        if self.dataset.is_ready():
+            yield self.get_rides(start=start, end=end, fields=fields)
+            return
 
         try:
-            while has_more:
-                query_params = {"data_source_id": _self.datasource_id}
-
-                if month:
-                    query_params["filter"] = {
-                        "property": "Month",
-                        "rich_text": {
-                            "equals": month
-                        }
-                    }
-
-                if start_cursor:
-                    query_params["start_cursor"] = start_cursor
-
-                data = _self.client.data_sources.query(**query_params)
-
-                for row in data["results"]:
-                    props = row["properties"]
-                    rides.append({
-                        "id": row["id"],
-                        "date": props["Date"]["date"]["start"] if props["Date"]["date"] else None,
-                        "time": props["Time"]["rich_text"][0]["text"]["content"] if props["Time"][
-                            "rich_text"] else "Unknown",
-                        "amount": props["Amount"]["number"] if props["Amount"]["number"] else 0,
-                    })
-
-                has_more = data.get("has_more", False)
-                start_cursor = data.get("next_cursor")
-
-            return rides
+            for pages in self.mirror.iter_sync():
+                decoder = ColumnarDecoder(RIDE_SCHEMA, RIDE_COLUMNS)
+                for page in pages:
+                    decoder.append_page(page)
+                chunk = decoder.frame()
+                if start:
+                    chunk = chunk[chunk["date"] >= pd.Timestamp(start)]
+                if end:
+                    chunk = chunk[chunk["date"] <= pd.Timestamp(end)]
+                if not chunk.empty:
+                    yield chunk[["id", *fields]] if fields else chunk
         except Exception as e:
-            st.error(f"Error fetching rides: {e}")
-            return []
+            st.error(f"Error syncing rides: {e}")
+
+    def refresh(self):
+        """Start a background sync, unless the first load is still streaming in the foreground"""
+        if self.dataset.is_ready():
+            self.dataset.reconcile()
+
+    def _invalidate(self, pages):
+        """
+        Write pages returned by Notion through the mirror into the dataset; all local.
+
+        Only the written rows are patched into the in-memory frame. Cached filtered reads are
+        keyed by dataset version, so they only need dropping while the version is not set yet.
+
+        Args:
+            pages: Pages the write created, updated or archived.
+        """
+        self.dataset.apply(pages)
+        if not self.dataset.is_ready():
+            NotionService._load_rides.clear()
 
     def save_ride(self, ride_date, ride_time, amount):
         """Save ride to Notion"""
@@ -213,7 +321,7 @@ class NotionService:
             )
             if response and response.get("id"):
                 st.success(f"✅ Ride saved to Notion successfully!\n\n**Title:** {page_title} for PKR {amount:,.2f}")
-                st.cache_data.clear()
+                self._invalidate([response])
                 return True
             else:
                 st.warning("⚠️ Ride creation request sent, but no confirmation received from Notion.")
@@ -222,19 +330,94 @@ class NotionService:
             st.error(f"Error: {e}")
             return False
 
+    def archive_rides(self, ride_ids, on_progress=None):
+        """
+        Archive many rides concurrently, paced by the request scheduler.
+
+        Args:
+            ride_ids: Notion page IDs of the rides to archive.
+            on_progress: Called with (done, total) after each ride is archived or fails.
+
+        Returns:
+            List of (ride_id, error) pairs for the rides that could not be archived.
+        """
+        archived, failed = [], []
+        requests = map_concurrently(lambda ride_id: self.client.pages.update(ride_id, archived=True), ride_ids)
+        for done, (ride_id, response, error) in enumerate(requests, start=1):
+            if error:
+                failed.append((ride_id, error))
+            else:
+                archived.append(response)
+            if on_progress:
+                on_progress(done, len(ride_ids))
+
+        # One mirror write and one cache invalidation for the whole batch, if any page was written
+        if archived:
+            self._invalidate(archived)
+        return failed
+
     def delete_ride(self, ride_id):
         """Archive a ride in Notion"""
         try:
-            self.client.pages.update(ride_id, archived=True)
-            st.cache_data.clear()
+            response = self.client.pages.update(ride_id, archived=True)
+            self._invalidate([response])
             return True
         except Exception as e:
             st.error(f"Error deleting ride: {e}")
             return False
 
 
+def render_refresh_status(notion_service):
+    """Show how fresh the data is, and surface the last background sync error"""
+    dataset = notion_service.dataset
+    if dataset.error:
+        st.error(f"Error syncing rides: {dataset.error}")
+
+    age = dataset.age()
+    if dataset.is_refreshing():
+        st.caption("⏳ Refreshing from Notion...")
+    elif age is not None:
+        st.caption(f"🕒 Refreshed {int(age)}s ago" if age < 120 else f"🕒 Refreshed {int(age // 60)}m ago")
+
+
+def load_rides(notion_service, start=None, end=None, fields=None):
+    """
+    Load rides, showing rows and running totals while a first sync is streaming in.
+
+    Args:
+        start: First date to include (datetime.date). If None, the range is open at the start.
+        end: Last date to include (datetime.date). If None, the range is open at the end.
+        fields: Columns the caller needs besides "id". If None, loads every column.
+    """
+    if notion_service.dataset.is_ready():
+        return notion_service.get_rides(start=start, end=end, fields=fields)
+
+    preview = st.empty()
+    count, total = 0, 0
+    first_rows = []
+    for chunk in notion_service.iter_rides(start=start, end=end, fields=fields):
+        count += len(chunk)
+        total += chunk["amount"].sum()
+        if sum(len(rows) for rows in first_rows) < 100:
+            first_rows.append(chunk)
+
+        with preview.container():
+            st.caption(f"⏳ Loading rides... {count} so far")
+            col1, col2 = st.columns(2)
+            col1.metric("💲 Total Spend so far", f"PKR {total:,.2f}")
+            col2.metric("💸 Average Spend so far", f"PKR {total / count:,.2f}")
+            first = pd.concat(first_rows).head(100).drop(columns=["id"])
+            if "time" in first:
+                first["time"] = format_minutes(first["time"])
+            st.dataframe(first)
+    preview.empty()
+
+    return notion_service.get_rides(start=start, end=end, fields=fields)
+
+
+@st.fragment
 def render_add_ride_tab(notion_service):
-    """Render the Add Ride tab"""
+    """Render the Add Ride tab; a fragment, so the form reruns only this tab"""
     st.header("🚖 Add a Ride")
 
     pkt = pytz.timezone("Asia/Karachi")
@@ -261,13 +444,13 @@ def render_add_ride_tab(notion_service):
             notion_service.save_ride(ride_date, ride_time, amount)
 
 
-def render_all_data(df):
-    """Render all data view"""
+def render_all_data(df, cube):
+    """Render all data view, with month totals from the rollup cube"""
     st.subheader("All Ride Data")
     display_df = df.drop(columns=["id", "date"]).rename(columns={"date_display": "date"})
     st.dataframe(display_df)
 
-    month_totals = df.groupby(["year", "month"])["amount"].sum().reset_index()
+    month_totals = cube.by_month()
     st.subheader("Total per Month")
     st.bar_chart(month_totals.set_index("month"))
 
@@ -276,8 +459,9 @@ def render_all_data(df):
     st.dataframe(month_totals)
 
 
+@st.fragment
 def render_by_month(notion_service):
-    """Render by month view with separate Month and Year selectors, fetching filtered data from Notion"""
+    """Render by month view with separate Month and Year selectors; picking a month reruns only this view"""
     st.subheader("Filter by Month and Year")
 
     pkt = pytz.timezone("Asia/Karachi")
@@ -300,53 +484,51 @@ def render_by_month(notion_service):
             index=years.index(current_year)
         )
 
+    month_start, month_end = month_range(selected_year, MONTHS.index(selected_month_name) + 1)
     with st.spinner(f"Loading rides for {selected_month_name} {selected_year}..."):
-        rides = notion_service.get_rides(month=f"{selected_month_name} {selected_year}")
+        df = load_rides(notion_service, start=month_start, end=month_end, fields=["date", "time", "amount"])
 
-    if not rides:
+    if df.empty:
         st.info(f"No rides found for {selected_month_name} {selected_year}.")
         return
 
-    df = pd.DataFrame(rides)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["month"] = df["date"].dt.strftime("%B")
-    df["year"] = df["date"].dt.year
-    df["date_display"] = df["date"].dt.strftime("%d-%B-%Y")
+    filtered_df = df.copy()
+    filtered_df["month"] = filtered_df["date"].dt.strftime("%B")
+    filtered_df["year"] = filtered_df["date"].dt.year
+    filtered_df["date_display"] = filtered_df["date"].dt.strftime("%d-%B-%Y")
 
-    filtered_df = df[df["year"] == selected_year]
-
-    if filtered_df.empty:
-        st.info(f"No rides found for {selected_month_name} {selected_year}.")
-        return
-
-    filtered_df = filtered_df.sort_values(by="date", ascending=True)
+    filtered_df = filtered_df.sort_values(by=["date", "time"], ascending=True)
+    filtered_df["time"] = format_minutes(filtered_df["time"])
     filtered_df.index = range(1, len(filtered_df) + 1)
 
     display_df = filtered_df.drop(columns=["id", "date"]).rename(columns={"date_display": "date"})
     st.write(display_df)
 
-    total = filtered_df["amount"].sum()
-    avg = filtered_df["amount"].mean() if not filtered_df.empty else 0
+    summary = notion_service.dataset.cube().summary(selected_year, MONTHS.index(selected_month_name) + 1)
+    total = summary["sum"]
+    avg = summary["sum"] / summary["count"] if summary["count"] else 0
 
     st.metric("💲 Total Spend", f"PKR {total:,.2f}")
     st.metric("💸 Average Spend", f"PKR {avg:,.2f}")
 
 
-def render_summary(df):
-    """Render summary view"""
+def render_summary(cube):
+    """Render summary view from the rollup cube"""
     st.subheader("Overall Summary")
-    total_spend = df["amount"].sum()
-    avg_spend = df["amount"].mean()
+    summary = cube.summary()
+    total_spend = summary["sum"]
+    avg_spend = summary["sum"] / summary["count"] if summary["count"] else 0
 
     st.metric("💲 Total Spend (All Time)", f"PKR {total_spend:,.2f}")
     st.metric("💸 Average Spend per Ride", f"PKR {avg_spend:,.2f}")
 
-    month_totals = df.groupby(["year", "month"])["amount"].sum().reset_index()
+    month_totals = cube.by_month()
     st.bar_chart(month_totals.set_index("month"))
 
 
+@st.fragment
 def render_delete(notion_service):
-    """Render delete rides view with separate Month and Year selectors"""
+    """Render delete rides view with separate Month and Year selectors; selecting rides reruns only this view"""
     st.subheader("Delete Rides by Month/Year")
 
     pkt = pytz.timezone("Asia/Karachi")
@@ -371,33 +553,64 @@ def render_delete(notion_service):
             key="delete_year"
         )
 
+    if "delete_result" in st.session_state:
+        st.success(st.session_state.pop("delete_result"))
+
+    month_start, month_end = month_range(selected_year, MONTHS.index(selected_month_name) + 1)
     with st.spinner(f"Loading rides for {selected_month_name} {selected_year}..."):
-        rides = notion_service.get_rides(month=f"{selected_month_name} {selected_year}")
+        df = load_rides(notion_service, start=month_start, end=month_end, fields=["date", "time", "amount"])
 
-    if not rides:
+    if df.empty:
         st.info(f"No rides found for {selected_month_name} {selected_year}.")
         return
 
-    df = pd.DataFrame(rides)
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["month"] = df["date"].dt.strftime("%B")
-    df["year"] = df["date"].dt.year
-    df["date_display"] = df["date"].dt.strftime("%d-%B-%Y")
+    filtered_df = df.copy()
+    filtered_df["month"] = filtered_df["date"].dt.strftime("%B")
+    filtered_df["year"] = filtered_df["date"].dt.year
+    filtered_df["date_display"] = filtered_df["date"].dt.strftime("%d-%B-%Y")
+
+    filtered_df = filtered_df.sort_values(by=["date", "time"], ascending=True)
+    filtered_df["time"] = format_minutes(filtered_df["time"])
+    labels = {
+        ride["id"]: f"{ride['date'].strftime('%d-%b-%Y')} @ {ride['time']} | PKR {ride['amount']}"
+        for _, ride in filtered_df.iterrows()
+    }
+
+    selection = st.radio("Select Rides", ["All", "Date Range", "Individual"], horizontal=True,
+                         key="delete_selection")
+    if selection == "All":
+        selected_df = filtered_df
+    elif selection == "Date Range":
+        days = sorted(filtered_df["date"].dt.date.unique())
+        day_from, day_to = st.select_slider("Date range", options=days, value=(days[0], days[-1]),
+                                            format_func=lambda d: d.strftime("%d-%b-%Y"), key="delete_range")
+        selected_df = filtered_df[filtered_df["date"].dt.date.between(day_from, day_to)]
+    else:
+        picked = st.multiselect("Rides", list(labels), format_func=labels.get, key="delete_picked")
+        selected_df = filtered_df[filtered_df["id"].isin(picked)]
 
-    filtered_df = df[df["year"] == selected_year]
+    display_df = selected_df.drop(columns=["id", "date"]).rename(columns={"date_display": "date"})
+    display_df.index = range(1, len(display_df) + 1)
+    st.dataframe(display_df)
 
-    if filtered_df.empty:
-        st.info(f"No rides found for {selected_month_name} {selected_year}.")
+    if selected_df.empty:
         return
 
-    for _, ride in filtered_df.iterrows():
-        with st.expander(
-                f"{ride['date'].strftime('%d-%b-%Y')} @ {ride['time']} | PKR {ride['amount']} | {ride['month']} {ride['year']}"):
-            if st.button("🗑 Delete Ride", key=f"delete_{ride['id']}"):
-                if notion_service.delete_ride(ride["id"]):
-                    st.success(f"Deleted ride from {ride['date'].strftime('%d-%b-%Y')} @ {ride['time']}")
-                    time.sleep(1)
-                    st.rerun()
+    if st.button(f"🗑 Archive {len(selected_df)} Rides (PKR {selected_df['amount'].sum():,})", key="delete_rides"):
+        progress = st.progress(0.0, text="Archiving...")
+        failed = notion_service.archive_rides(
+            selected_df["id"].tolist(),
+            on_progress=lambda done, total: progress.progress(done / total, text=f"Archived {done}/{total}")
+        )
+        message = f"Deleted {len(selected_df) - len(failed)} rides"
+        if not failed:
+            # Rerun once for the whole batch so the list reflects the archive
+            st.session_state["delete_result"] = message
+            st.rerun()
+
+        st.success(message)
+        for ride_id, error in failed:
+            st.error(f"Error deleting ride {labels[ride_id]}: {error}")
 
 
 def render_view_rides_tab(notion_service):
@@ -405,52 +618,42 @@ def render_view_rides_tab(notion_service):
     st.header("📊 Ride Stats")
 
     if st.button("🔄 Refresh Data"):
-        st.cache_data.clear()
-        st.rerun()
+        notion_service.refresh()
+    render_refresh_status(notion_service)
 
-    view = st.radio("Select View", ["📅 By Month", "📋 All Data", "📊 Summary", "❌ Delete"], horizontal=True)
+    view = st.radio("Select View", ["📅 By Month", "📋 All Data", "📊 Summary", "❌ Delete"], horizontal=True,
+                    key="rides_view")
 
     if view == "📅 By Month":
         render_by_month(notion_service)
     elif view == "❌ Delete":
         render_delete(notion_service)
     else:
-        rides = notion_service.get_rides()
+        df = load_rides(notion_service)
 
-        if rides:
-            df = pd.DataFrame(rides)
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-            df["month"] = df["date"].dt.strftime("%B")
-            df["year"] = df["date"].dt.year
-            df = df.sort_values(by="date", ascending=True)
-            df["date_display"] = df["date"].dt.strftime("%d-%B-%Y")
-            df.index = range(1, len(df) + 1)
+        if not df.empty:
+            df = notion_service.prepared_rides()
 
             if view == "📋 All Data":
-                render_all_data(df)
+                render_all_data(df, notion_service.dataset.cube())
             elif view == "📊 Summary":
-                render_summary(df)
+                render_summary(notion_service.dataset.cube())
         else:
             st.info("❌ No rides recorded yet.")
 
 
+@st.fragment
 def render_search_filter_tab(notion_service):
-    """Render the Search & Filter tab"""
+    """Render the Search & Filter tab; a fragment, so changing a filter reruns only the panel and its results"""
     st.header("🔍 Search & Filter Rides")
 
     if st.button("🔄 Refresh Data", key="refresh_search"):
-        st.cache_data.clear()
-        st.rerun()
+        notion_service.refresh()
+    render_refresh_status(notion_service)
 
-    rides = notion_service.get_rides()
-
-    if rides:
-        df = pd.DataFrame(rides)
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df["month"] = df["date"].dt.strftime("%B")
-        df["year"] = df["date"].dt.year
-        df = df.sort_values(by="date", ascending=False)
+    df = load_rides(notion_service, fields=["date", "amount"])
 
+    if not df.empty:
         st.subheader("Filter Options")
         filter_col1, filter_col2 = st.columns(2)
 
@@ -473,13 +676,14 @@ def render_search_filter_tab(notion_service):
                 amount_range = st.slider("Select amount range (PKR)", min_value=min_amount, max_value=max_amount,
                                          value=(min_amount, max_amount), step=50)
 
-        filtered_df = df.copy()
-        if use_date_range:
-            filtered_df = filtered_df[
-                (filtered_df["date"].dt.date >= date_from) & (filtered_df["date"].dt.date <= date_to)]
-        if use_amount_range:
-            filtered_df = filtered_df[
-                (filtered_df["amount"] >= amount_range[0]) & (filtered_df["amount"] <= amount_range[1])]
+        # Only the matching rows are read, from the sorted dataset indexes or straight from Notion
+        filtered_df = notion_service.search_rides(
+            date_from=date_from if use_date_range else None,
+            date_to=date_to if use_date_range else None,
+            amount_min=amount_range[0] if use_amount_range else None,
+            amount_max=amount_range[1] if use_amount_range else None,
+        )
+        filtered_df = filtered_df.assign(month=filtered_df["date"].dt.strftime("%B"), year=filtered_df["date"].dt.year)
 
         st.subheader(f"Results ({len(filtered_df)} rides found)")
 
@@ -491,8 +695,9 @@ def render_search_filter_tab(notion_service):
             with col3:
                 st.metric("Number of Rides", len(filtered_df))
 
-            filtered_df["date_display"] = filtered_df["date"].dt.strftime("%d-%B-%Y")
-            display_df = filtered_df[["date_display", "time", "amount", "month", "year"]].copy()
+            display_df = filtered_df[["date", "time", "amount", "month", "year"]].copy()
+            display_df["date"] = display_df["date"].dt.strftime("%d-%B-%Y")
+            display_df["time"] = format_minutes(display_df["time"])
             display_df.columns = ["Date", "Time", "Amount (PKR)", "Month", "Year"]
             display_df.index = range(1, len(display_df) + 1)
             st.dataframe(display_df, width="stretch")
@@ -526,16 +731,20 @@ def main():
         st.rerun()
 
     notion_service = NotionService()
-    main_tabs = st.tabs(["🚖 Add Ride", "📊 View Rides", "🔍 Search & Filter"])
-
-    with main_tabs[0]:
-        render_add_ride_tab(notion_service)
-
-    with main_tabs[1]:
-        render_view_rides_tab(notion_service)
-
-    with main_tabs[2]:
-        render_search_filter_tab(notion_service)
+    sections = {
+        "🚖 Add Ride": render_add_ride_tab,
+        "📊 View Rides": render_view_rides_tab,
+        "🔍 Search & Filter": render_search_filter_tab,
+    }
+
+    # Widgets of a hidden section drop their state; carry the chosen view over
+    if "rides_view" in st.session_state:
+        st.session_state["rides_view"] = st.session_state["rides_view"]
+
+    # Unlike st.tabs, only the selected section runs on a rerun
+    section = st.radio("Section", list(sections), horizontal=True, key="section", label_visibility="collapsed")
+    st.divider()
+    sections[section](notion_service)
 
 
 if __name__ == "__main__":
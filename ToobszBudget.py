@@ -6,7 +6,14 @@ import extra_streamlit_components as stx
 import pandas as pd
 import pytz
 import streamlit as st
-from notion_client import Client
+
+from notion_dataset import NotionDataset
+from notion_metrics import budget_metrics
+from notion_mirror import NotionMirror
+from notion_frames import TRANSACTION_COLUMNS, ColumnarDecoder, display_frame, format_minutes
+from notion_filters import date_range_filter, month_range, search_filter
+from notion_schema import TRANSACTION_SCHEMA, notion_properties, parse_transaction
+from notion_scheduler import ScheduledClient, map_concurrently
 
 
 def setup_page():
@@ -137,6 +144,33 @@ SAVINGS_DEBIT_CATEGORIES = [
     "Healthcare", "Education", "Travel", "Electronics", "Clothing", "Other"
 ]
 
+TRANSACTION_TYPES = ["Expense", "Income", "Savings Debit"]
+
+# Rows per page of the delete view
+DELETE_PAGE_SIZE = 25
+
+# Transaction tables keep date and amount numeric; the browser formats them
+TRANSACTION_COLUMN_CONFIG = {
+    "date": st.column_config.DateColumn("Date", format="YYYY-MM-DD"),
+    "time": "Time",
+    "type": "Type",
+    "category": "Category",
+    "amount": st.column_config.NumberColumn("Amount (PKR)", format="accounting"),
+    "month": "Month",
+    "description": "Description",
+}
+TRANSACTION_FIELDS = ["date", "time", "type", "category", "amount", "description"]
+
+# Transaction field -> label of its column picker in the import view
+IMPORT_FIELDS = {
+    "date": "Date",
+    "amount": "Amount",
+    "type": "Type",
+    "category": "Category",
+    "time": "Time",
+    "description": "Description",
+}
+
 MONTHS = [
     "January", "February", "March", "April", "May", "June",
     "July", "August", "September", "October", "November", "December"
@@ -151,113 +185,429 @@ class NotionService:
         self.database_id = st.secrets["database_id_2"]
         self.datasource_id = st.secrets["data_source_id_2"]
         self.client = self._get_client()
+        self.mirror = self._get_mirror(self.datasource_id)
+        self.dataset = self._get_dataset(self.datasource_id)
+        # Serve what is cached and refresh it in the background once it is stale; the first
+        # load is left to the foreground streaming sync, which a background one would block
+        if self.dataset.is_ready():
+            self.dataset.revalidate()
 
     @staticmethod
     @st.cache_resource
     def _get_client():
         """Create and cache Notion client"""
         try:
-            return Client(auth=st.secrets["notion_token_2"])
+            return ScheduledClient(auth=st.secrets["notion_token_2"])
         except Exception as e:
             st.error(f"Failed to initialize Notion client: {e}")
             return None
 
-    @st.cache_data(ttl=300)
-    def get_transactions(_self, month=None):
+    @staticmethod
+    @st.cache_resource
+    def _get_mirror(datasource_id):
+        """Create and cache the local SQLite mirror of the transactions data source"""
+        return NotionMirror(NotionService._get_client(), datasource_id, parse_transaction,
+                           properties=notion_properties(TRANSACTION_SCHEMA),
+                           auth=st.secrets["notion_token_2"])
+
+    @staticmethod
+    @st.cache_resource
+    def _get_dataset(datasource_id):
+        """Create and cache the in-memory, Parquet-snapshotted copy of the transactions"""
+        return NotionDataset(NotionService._get_mirror(datasource_id), TRANSACTION_SCHEMA, TRANSACTION_COLUMNS,
+                             dimensions=("type", "category"), text_fields=("description", "category"),
+                             on_change=NotionService._load_transactions.clear)
+
+    @st.cache_resource(ttl=300, max_entries=32)
+    def _load_transactions(_self, filter=None, version=None):
         """
-        Fetch transactions from Notion with optional month filter.
+        Load the transactions matching a Notion filter, cached per filter and dataset version.
+
+        Results are shared read-only by every tab and rerun; unlike st.cache_data, returning
+        them makes no copy, so callers must not modify them in place.
+
+        The full history comes from the in-memory dataset, which starts from its Parquet
+        snapshot. Filtered reads are only needed before anything is cached, so they are sent
+        to Notion. Delta syncs run in the background (see NotionDataset.revalidate), so once
+        a snapshot or mirror exists nothing here waits on Notion. Rows are decoded column by
+        column into one typed DataFrame.
+        """
+        decoder = ColumnarDecoder(TRANSACTION_SCHEMA, TRANSACTION_COLUMNS)
+        try:
+            if filter is None:
+                return _self.dataset.frame()
+            for page in _self.mirror.query(filter):
+                decoder.append_page(page)
+        except Exception as e:
+            st.error(f"Error fetching transactions: {e}")
+        return decoder.frame()
+
+    def get_transactions(self, start=None, end=None, fields=None):
+        """
+        Fetch transactions as a typed DataFrame, newest first, with optional date range and field projection.
+
+        Args:
+            start: First date to include (datetime.date). If None, the range is open at the start.
+            end: Last date to include (datetime.date). If None, the range is open at the end.
+            fields: Columns the caller needs besides "id" (e.g., ["date", "amount"]). If None, returns every column.
+        """
+        if self.dataset.is_ready():
+            # Any month or year is a local slice of the full dataset
+            df = self.dataset.select(start, end)
+        else:
+            # Nothing cached yet: query Notion for just this range
+            df = self._load_transactions(filter=date_range_filter(start, end), version=self.dataset.version)
+        return df[["id", *fields]] if fields else df
+
+    def search_transactions(self, date_from=None, date_to=None, amount_min=None, amount_max=None,
+                            transaction_type=None, category=None):
+        """
+        Fetch the transactions matching Search & Filter choices as a typed DataFrame, newest first.
+
+        Once the dataset is cached, the date and amount ranges are binary searches over its
+        sorted indexes and type and category are only checked on the rows they return. Before
+        that, the choices are sent to Notion as one filter.
 
         Args:
-            month: Filter by month string (e.g., "January 2026"). If None, fetches all transactions.
+            date_from: First date to include (datetime.date).
+            date_to: Last date to include (datetime.date).
+            amount_min: Smallest amount to include.
+            amount_max: Largest amount to include.
+            transaction_type: Type to match (e.g., "Expense").
+            category: Category to match exactly.
         """
-        transactions = []
-        has_more = True
-        start_cursor = None
+        if not self.dataset.is_ready():
+            return self._load_transactions(filter=search_filter(date_from, date_to, amount_min, amount_max,
+                                                                transaction_type, category),
+                                           version=self.dataset.version)
+        df = self.dataset.select(date_from, date_to, amount_min, amount_max)
+        if transaction_type:
+            df = df[df["type"] == transaction_type]
+        if category:
+            df = df[df["category"] == category]
+        return df
+
+    def iter_transactions(self, start=None, end=None):
+        """
+        Yield transactions as typed DataFrame chunks while they are fetched.
+
+        On the first load the mirror is still empty, so each batch of pages is decoded and
+        yielded as soon as Notion returns it. Once the mirror is warm, the cached DataFrame
+        is yielded in one chunk.
+
+        Args:
+            start: First date to include (datetime.date). If None, the range is open at the start.
+            end: Last date to include (datetime.date). If None, the range is open at the end.
+        """
+        if self.dataset.is_ready():
+            yield self.get_transactions(start=start, end=end)
+            return
 
         try:
-            while has_more:
-                query_params = {"data_source_id": _self.datasource_id}
-
-                if month:
-                    query_params["filter"] = {
-                        "property": "Month",
-                        "rich_text": {
-                            "equals": month
-                        }
-                    }
-
-                if start_cursor:
-                    query_params["start_cursor"] = start_cursor
-
-                data = _self.client.data_sources.query(**query_params)
-
-                for row in data["results"]:
-                    props = row["properties"]
-                    transactions.append({
-                        "id": row["id"],
-                        "date": props["Date"]["date"]["start"] if props["Date"]["date"] else None,
-                        "time": props["Time"]["rich_text"][0]["text"]["content"] if props["Time"][
-                            "rich_text"] else "Unknown",
-                        "type": props["Type"]["select"]["name"] if props["Type"]["select"] else "Unknown",
-                        "category": props["Category"]["rich_text"][0]["text"]["content"] if props["Category"][
-                            "rich_text"] else "Unknown",
-                        "amount": props["Amount"]["number"] if props["Amount"]["number"] else 0,
-                        "month": props["Month"]["rich_text"][0]["text"]["content"] if props["Month"][
-                            "rich_text"] else "Unknown",
-                        "description": props["Description"]["rich_text"][0]["text"]["content"] if
-                        props["Description"]["rich_text"] else ""
-                    })
-
-                has_more = data.get("has_more", False)
-                start_cursor = data.get("next_cursor")
-
-            return transactions
+            for pages in self.mirror.iter_sync():
+                decoder = ColumnarDecoder(TRANSACTION_SCHEMA, TRANSACTION_COLUMNS)
+                for page in pages:
+                    decoder.append_page(page)
+                chunk = decoder.frame()
+                if start:
+                    chunk = chunk[chunk["date"] >= pd.Timestamp(start)]
+                if end:
+                    chunk = chunk[chunk["date"] <= pd.Timestamp(end)]
+                if not chunk.empty:
+                    yield chunk
         except Exception as e:
-            st.error(f"Error fetching transactions: {e}")
-            return []
+            st.error(f"Error syncing transactions: {e}")
+
+    def refresh(self):
+        """Start a background sync, unless the first load is still streaming in the foreground"""
+        if self.dataset.is_ready():
+            self.dataset.reconcile()
+
+    def _invalidate(self, pages):
+        """
+        Write pages returned by Notion through the mirror into the dataset; all local.
+
+        Only the written rows are patched into the in-memory frame. Cached filtered reads are
+        keyed by dataset version, so they only need dropping while the version is not set yet.
+
+        Args:
+            pages: Pages the write created, updated or archived.
+        """
+        self.dataset.apply(pages)
+        if not self.dataset.is_ready():
+            NotionService._load_transactions.clear()
+
+    def _create_page(self, transaction_type, category, date_obj, time_obj, amount, description):
+        """Create the Notion page of one transaction and return it"""
+        month = date_obj.strftime("%B %Y")
+        formatted_time = time_obj.strftime("%I:%M %p")
+
+        return self.client.pages.create(
+            parent={"data_source_id": self.datasource_id},
+            properties={
+                "Name": {"title": [{"text": {"content": f"{transaction_type} - {category} ({date_obj})"}}]},
+                "Type": {"select": {"name": transaction_type}},
+                "Category": {"rich_text": [{"text": {"content": category}}]},
+                "Date": {"date": {"start": date_obj.isoformat()}},
+                "Time": {"rich_text": [{"text": {"content": formatted_time}}]},
+                "Amount": {"number": amount},
+                "Month": {"rich_text": [{"text": {"content": month}}]},
+                "Description": {"rich_text": [{"text": {"content": description or ""}}]},
+            },
+        )
 
     def save_transaction(self, transaction_type, category, date_obj, time_obj, amount, description):
         """Save transaction to Notion"""
-        month = date_obj.strftime("%B %Y")
         formatted_time = time_obj.strftime("%I:%M %p")
 
         try:
-            self.client.pages.create(
-                parent={"data_source_id": self.datasource_id},
-                properties={
-                    "Name": {"title": [{"text": {"content": f"{transaction_type} - {category} ({date_obj})"}}]},
-                    "Type": {"select": {"name": transaction_type}},
-                    "Category": {"rich_text": [{"text": {"content": category}}]},
-                    "Date": {"date": {"start": date_obj.isoformat()}},
-                    "Time": {"rich_text": [{"text": {"content": formatted_time}}]},
-                    "Amount": {"number": amount},
-                    "Month": {"rich_text": [{"text": {"content": month}}]},
-                    "Description": {"rich_text": [{"text": {"content": description or ""}}]},
-                },
-            )
+            response = self._create_page(transaction_type, category, date_obj, time_obj, amount, description)
             st.success(
                 f"{transaction_type} - {category} for PKR {amount:,.2f} @ {date_obj} - {formatted_time} saved to Notion! ✅")
-            st.cache_data.clear()
+            self._invalidate([response])
             return True
         except Exception as e:
             st.error(f"Error saving transaction: {e}")
             return False
 
+    def import_transactions(self, rows, on_progress=None):
+        """
+        Create many transactions concurrently, paced by the request scheduler.
+
+        Args:
+            rows: Dicts with "type", "category", "date", "time", "amount" and "description".
+            on_progress: Called with (done, total) after each page is created or fails.
+
+        Returns:
+            List of (row, error) pairs for the rows that could not be created.
+        """
+        def create(row):
+            return self._create_page(row["type"], row["category"], row["date"], row["time"], row["amount"],
+                                     row["description"])
+
+        created, failed = [], []
+        for done, (row, response, error) in enumerate(map_concurrently(create, rows), start=1):
+            if error:
+                failed.append((row, error))
+            else:
+                created.append(response)
+            if on_progress:
+                on_progress(done, len(rows))
+
+        # One mirror write and one cache invalidation for the whole batch, if any page was written
+        if created:
+            self._invalidate(created)
+        return failed
+
+    def archive_transactions(self, transaction_ids, on_progress=None):
+        """
+        Archive many transactions concurrently, paced by the request scheduler.
+
+        Args:
+            transaction_ids: Notion page IDs of the transactions to archive.
+            on_progress: Called with (done, total) after each transaction is archived or fails.
+
+        Returns:
+            List of (transaction_id, error) pairs for the transactions that could not be archived.
+        """
+        archived, failed = [], []
+        requests = map_concurrently(lambda page_id: self.client.pages.update(page_id, archived=True),
+                                    transaction_ids)
+        for done, (transaction_id, response, error) in enumerate(requests, start=1):
+            if error:
+                failed.append((transaction_id, error))
+            else:
+                archived.append(response)
+            if on_progress:
+                on_progress(done, len(transaction_ids))
+
+        # One mirror write and one cache invalidation for the whole batch, if any page was written
+        if archived:
+            self._invalidate(archived)
+        return failed
+
     def delete_transaction(self, transaction_id):
         """Archive a transaction in Notion"""
         try:
-            self.client.pages.update(transaction_id, archived=True)
-            st.cache_data.clear()
+            response = self.client.pages.update(transaction_id, archived=True)
+            self._invalidate([response])
             return True
         except Exception as e:
             st.error(f"Error deleting transaction: {e}")
             return False
 
 
+def render_refresh_status(notion_service):
+    """Show how fresh the data is, and surface the last background sync error"""
+    dataset = notion_service.dataset
+    if dataset.error:
+        st.error(f"Error syncing transactions: {dataset.error}")
+
+    age = dataset.age()
+    if dataset.is_refreshing():
+        st.caption("⏳ Refreshing from Notion...")
+    elif age is not None:
+        st.caption(f"🕒 Refreshed {int(age)}s ago" if age < 120 else f"🕒 Refreshed {int(age // 60)}m ago")
+
+
+def load_transactions(notion_service, start=None, end=None):
+    """
+    Load transactions, showing rows and running totals while a first sync is streaming in.
+
+    Args:
+        start: First date to include (datetime.date). If None, the range is open at the start.
+        end: Last date to include (datetime.date). If None, the range is open at the end.
+    """
+    if notion_service.dataset.is_ready():
+        return notion_service.get_transactions(start=start, end=end)
+
+    preview = st.empty()
+    count, income, expense = 0, 0, 0
+    first_rows = []
+    for chunk in notion_service.iter_transactions(start=start, end=end):
+        count += len(chunk)
+        income += chunk.loc[chunk["type"] == "Income", "amount"].sum()
+        expense += chunk.loc[chunk["type"] == "Expense", "amount"].sum()
+        if sum(len(rows) for rows in first_rows) < 100:
+            first_rows.append(chunk)
+
+        with preview.container():
+            st.caption(f"⏳ Loading transactions... {count} so far")
+            col1, col2 = st.columns(2)
+            col1.metric("💰 Income so far", f"PKR {income:,.2f}")
+            col2.metric("💸 Expenses so far", f"PKR {expense:,.2f}")
+            first = pd.concat(first_rows).head(100).drop(columns=["id"])
+            st.dataframe(first.assign(time=format_minutes(first["time"])))
+    preview.empty()
+
+    return notion_service.get_transactions(start=start, end=end)
+
+
+def read_import_file(uploaded_file):
+    """Read an uploaded CSV or XLSX bank export into a DataFrame"""
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        return pd.read_excel(uploaded_file, engine="openpyxl")
+    return pd.read_csv(uploaded_file)
+
+
+def guess_column(columns, field):
+    """Return the index of the first column whose name mentions the field, or 0 for none"""
+    for i, column in enumerate(columns[1:], start=1):
+        if field in str(column).lower():
+            return i
+    return 0
+
+
+def prepare_import_rows(df, mapping, day_first=True):
+    """
+    Turn an imported file into transaction rows ready for NotionService.import_transactions.
+
+    Args:
+        df: The imported file.
+        mapping: Transaction field -> column name of the file, or None when not mapped.
+            Without a Type column, negative amounts become expenses and positive ones income.
+        day_first: Whether dates like 01/02/2026 mean 1 February.
+
+    Returns:
+        (rows, invalid), where invalid lists (row number, reason) for the rows that were skipped.
+    """
+    def column(field):
+        return df[mapping[field]] if mapping[field] else pd.Series("", index=df.index)
+
+    dates = pd.to_datetime(column("date"), format="mixed", dayfirst=day_first, errors="coerce")
+    # Accounting-style negatives like (200) keep their sign once the brackets are stripped
+    amounts = pd.to_numeric(column("amount").astype(str).str.strip()
+                            .str.replace(r"^\((.*)\)$", r"-\1", regex=True)
+                            .str.replace(r"[^0-9.\-]", "", regex=True), errors="coerce")
+    if mapping["type"]:
+        types = column("type").astype(str).str.strip().str.title()
+    else:
+        types = pd.Series(["Expense" if a < 0 else "Income" for a in amounts], index=df.index)
+    categories = column("category").fillna("").astype(str).str.strip().replace("", "Other")
+    times = pd.to_datetime(column("time").astype(str), format="mixed", errors="coerce")
+    descriptions = column("description").fillna("").astype(str)
+
+    rows, invalid = [], []
+    for number, date, amount, transaction_type, category, time_value, description in zip(
+            range(1, len(df) + 1), dates, amounts, types, categories, times, descriptions):
+        if pd.isna(date):
+            invalid.append((number, "Invalid date"))
+        elif pd.isna(amount) or amount == 0:
+            invalid.append((number, "Invalid amount"))
+        elif transaction_type not in TRANSACTION_TYPES:
+            invalid.append((number, f"Unknown type '{transaction_type}'"))
+        else:
+            amount = abs(float(amount))
+            rows.append({
+                "row": number,
+                "type": transaction_type,
+                "category": category,
+                "date": date.date(),
+                "time": datetime.min.time() if pd.isna(time_value) else time_value.time(),
+                "amount": int(amount) if amount.is_integer() else amount,
+                "description": description,
+            })
+    return rows, invalid
+
+
+def render_import_transactions(notion_service):
+    """Render the bulk import view for CSV/XLSX bank exports"""
+    st.subheader("📥 Import Transactions")
+
+    uploaded_file = st.file_uploader("Bank export (CSV or XLSX)", type=["csv", "xlsx"])
+    if not uploaded_file:
+        return
+
+    try:
+        df = read_import_file(uploaded_file)
+    except Exception as e:
+        st.error(f"Error reading file: {e}")
+        return
+
+    st.caption(f"{len(df)} rows found")
+    st.dataframe(df.head(10))
+
+    st.write("**Map Columns**")
+    columns = ["—"] + list(df.columns)
+    mapping = {}
+    map_cols = st.columns(3)
+    for i, (field, label) in enumerate(IMPORT_FIELDS.items()):
+        choice = map_cols[i % 3].selectbox(label, columns, index=guess_column(columns, field),
+                                           key=f"import_{field}")
+        mapping[field] = None if choice == "—" else choice
+    day_first = st.checkbox("Dates are day first (e.g., 31/01/2026)", value=True)
+
+    if not mapping["date"] or not mapping["amount"]:
+        st.warning("⚠️ Map at least the Date and Amount columns.")
+        return
+
+    rows, invalid = prepare_import_rows(df, mapping, day_first)
+    st.info(f"{len(rows)} rows ready to import, {len(invalid)} will be skipped.")
+
+    if rows and st.button("📥 Import Transactions"):
+        progress = st.progress(0.0, text="Importing...")
+        failed = notion_service.import_transactions(
+            rows, on_progress=lambda done, total: progress.progress(done / total, text=f"Imported {done}/{total}")
+        )
+        st.success(f"✅ Imported {len(rows) - len(failed)} of {len(rows)} transactions")
+        invalid += [(row["row"], str(error)) for row, error in failed]
+
+    if invalid:
+        st.write("**Rows not imported**")
+        report = pd.DataFrame(invalid, columns=["Row", "Reason"]).sort_values("Row")
+        st.dataframe(report, hide_index=True)
+
+
+@st.fragment
 def render_add_transaction_tab(notion_service):
-    """Render the Add Transaction tab"""
+    """Render the Add Transaction tab; a fragment, so typing into the form reruns only this tab"""
     st.header("💸 Add a Transaction")
 
+    mode = st.radio("Mode", ["➕ Single", "📥 Import File"], horizontal=True, key="add_mode")
+    if mode == "📥 Import File":
+        render_import_transactions(notion_service)
+        return
+
     pkt = pytz.timezone("Asia/Karachi")
     now_pkt = datetime.now(pkt)
 
@@ -295,48 +645,42 @@ def render_add_transaction_tab(notion_service):
             st.warning("⚠️ Missing or Invalid Data Detected!")
 
 
-def render_dashboard(df):
-    """Render dashboard view"""
+def render_dashboard(cube):
+    """Render dashboard view from the rollup cube"""
     st.subheader("Financial Dashboard")
 
-    total_income = df[df["type"] == "Income"]["amount"].sum()
-    total_expense = df[df["type"] == "Expense"]["amount"].sum()
-    savings = df[df["category"] == "Savings"]["amount"].sum()
-    savings_debit = df[df["type"] == "Savings Debit"]["amount"].sum()
-    net_savings = savings - savings_debit
-    physical_investments = df[df["category"] == "Physical Investments"]["amount"].sum()
-    stocks = df[df["category"] == "Stocks"]["amount"].sum()
-    mutual_funds = df[df["category"] == "Mutual Funds"]["amount"].sum()
-    net_balance = total_income - total_expense
+    metrics = cube.metrics()
 
     col_a, col_b, col_c = st.columns(3)
-    col_a.metric("💰 Total Income", f"PKR {total_income:,.2f}")
-    col_b.metric("💸 Total Expenses", f"PKR {total_expense:,.2f}")
-    col_a.metric("💳 Total Savings", f"PKR {savings:,.2f}",
-                 delta=f"{savings / total_income * 100:.1f}%" if total_income > 0 else "0%")
-    col_a.metric("🥇 Total Physical Investments", f"PKR {physical_investments:,.2f}",
-                 delta=f"{physical_investments / total_income * 100:.1f}%" if total_income > 0 else "0%")
-    col_a.metric("📈 Total Stocks", f"PKR {stocks:,.2f}",
-                 delta=f"{stocks / total_income * 100:.1f}%" if total_income > 0 else "0%")
-    col_a.metric("💹 Total Mutual Funds", f"PKR {mutual_funds:,.2f}",
-                 delta=f"{mutual_funds / total_income * 100:.1f}%" if total_income > 0 else "0%")
-    col_c.metric("💵 Net Balance", f"PKR {net_balance:,.2f}", delta=f"{net_balance:,.2f}", delta_arrow="off")
-    col_c.metric("🤑 Net Savings", f"PKR {net_savings:,.2f}",
-                 delta=f"{net_savings / total_income * 100:.1f}%" if total_income > 0 else "0%")
+    col_a.metric("💰 Total Income", f"PKR {metrics.income:,.2f}")
+    col_b.metric("💸 Total Expenses", f"PKR {metrics.expense:,.2f}")
+    col_a.metric("💳 Total Savings", f"PKR {metrics.savings:,.2f}",
+                 delta=metrics.percent_of_income(metrics.savings))
+    col_a.metric("🥇 Total Physical Investments", f"PKR {metrics.physical_investments:,.2f}",
+                 delta=metrics.percent_of_income(metrics.physical_investments))
+    col_a.metric("📈 Total Stocks", f"PKR {metrics.stocks:,.2f}",
+                 delta=metrics.percent_of_income(metrics.stocks))
+    col_a.metric("💹 Total Mutual Funds", f"PKR {metrics.mutual_funds:,.2f}",
+                 delta=metrics.percent_of_income(metrics.mutual_funds))
+    col_c.metric("💵 Net Balance", f"PKR {metrics.net_balance:,.2f}", delta=f"{metrics.net_balance:,.2f}",
+                 delta_arrow="off")
+    col_c.metric("🤑 Net Savings", f"PKR {metrics.net_savings:,.2f}",
+                 delta=metrics.percent_of_income(metrics.net_savings))
 
     st.subheader("Income vs Expenses by Month")
-    month_summary = df.groupby(["month", "type"])["amount"].sum().reset_index()
+    month_summary = cube.by_month("type")
     month_pivot = month_summary.pivot(index="month", columns="type", values="amount").fillna(0)
     st.bar_chart(month_pivot)
 
     month_summary.index = range(1, len(month_summary) + 1)
-    month_summary["amount"] = month_summary["amount"].map("PKR {:,.2f}".format)
-    st.dataframe(month_summary)
-
-    expense_df = df[df["type"] == "Expense"]
-    if not expense_df.empty:
-        category_totals = expense_df.groupby("category")["amount"].sum().reset_index().sort_values("amount",
-                                                                                                   ascending=False)
+    st.dataframe(month_summary, column_config={
+        "month": "Month",
+        "type": "Type",
+        "amount": TRANSACTION_COLUMN_CONFIG["amount"],
+    })
+
+    category_totals = metrics.category_totals("Expense")
+    if not category_totals.empty:
         st.subheader("Expenses by Category")
         st.bar_chart(category_totals.set_index("category"))
 
@@ -347,10 +691,8 @@ def render_dashboard(df):
     else:
         st.info("No expenses recorded yet.")
 
-    income_df = df[df["type"] == "Income"]
-    if not income_df.empty:
-        category_totals = income_df.groupby("category")["amount"].sum().reset_index().sort_values("amount",
-                                                                                                  ascending=False)
+    category_totals = metrics.category_totals("Income")
+    if not category_totals.empty:
         st.subheader("Income by Category")
         st.bar_chart(category_totals.set_index("category"))
 
@@ -362,8 +704,9 @@ def render_dashboard(df):
         st.info("No income recorded yet.")
 
 
+@st.fragment
 def render_by_month(notion_service):
-    """Render by month view with separate Month and Year selectors"""
+    """Render by month view with separate Month and Year selectors; picking a month reruns only this view"""
     st.subheader("Filter by Month")
 
     pkt = pytz.timezone("Asia/Karachi")
@@ -387,145 +730,153 @@ def render_by_month(notion_service):
         )
 
     month_str = f"{selected_month_name} {selected_year}"
+    month_start, month_end = month_range(selected_year, MONTHS.index(selected_month_name) + 1)
 
     with st.spinner(f"Loading transactions for {month_str}..."):
-        transactions = notion_service.get_transactions(month=month_str)
+        filtered_df = load_transactions(notion_service, start=month_start, end=month_end)
 
-    if not transactions:
+    if filtered_df.empty:
         st.info(f"No transactions found for {month_str}.")
         return
 
-    filtered_df = pd.DataFrame(transactions)
-    filtered_df.index = range(1, len(filtered_df) + 1)
+    columns = [column for column in filtered_df.columns if column != "id"]
+    st.dataframe(display_frame(filtered_df, columns), column_config=TRANSACTION_COLUMN_CONFIG)
 
-    df_show = filtered_df.copy()
-    df_show["amount"] = df_show["amount"].map("PKR {:,.2f}".format)
-    st.write(df_show.drop(columns=["id"]))
-
-    income = filtered_df[filtered_df["type"] == "Income"]["amount"].sum()
-    expense = filtered_df[filtered_df["type"] == "Expense"]["amount"].sum()
-    savings = filtered_df[filtered_df["category"] == "Savings"]["amount"].sum()
-    savings_debit = filtered_df[filtered_df["type"] == "Savings Debit"]["amount"].sum()
-    net_savings = savings - savings_debit
-    physical_investments = filtered_df[filtered_df["category"] == "Physical Investments"]["amount"].sum()
-    stocks = filtered_df[filtered_df["category"] == "Stocks"]["amount"].sum()
-    mutual_funds = filtered_df[filtered_df["category"] == "Mutual Funds"]["amount"].sum()
-    balance = income - expense
+    metrics = notion_service.dataset.cube().metrics(selected_year, MONTHS.index(selected_month_name) + 1)
 
     col_a, col_b, col_c = st.columns(3)
-    col_a.metric("💰 Income", f"PKR {income:,.2f}")
-    col_c.metric("💸 Expenses", f"PKR {expense:,.2f}")
-    col_c.metric("💵 Balance", f"PKR {balance:,.2f}")
-    col_a.metric("💳 Savings", f"PKR {savings:,.2f}")
-    col_a.metric("🥇 Physical Investments", f"PKR {physical_investments:,.2f}")
-    col_a.metric("📈 Stocks", f"PKR {stocks:,.2f}")
-    col_a.metric("💹 Mutual Funds", f"PKR {mutual_funds:,.2f}")
-    col_c.metric("😔 Debit Savings", f"PKR {savings_debit:,.2f}")
+    col_a.metric("💰 Income", f"PKR {metrics.income:,.2f}")
+    col_c.metric("💸 Expenses", f"PKR {metrics.expense:,.2f}")
+    col_c.metric("💵 Balance", f"PKR {metrics.net_balance:,.2f}")
+    col_a.metric("💳 Savings", f"PKR {metrics.savings:,.2f}")
+    col_a.metric("🥇 Physical Investments", f"PKR {metrics.physical_investments:,.2f}")
+    col_a.metric("📈 Stocks", f"PKR {metrics.stocks:,.2f}")
+    col_a.metric("💹 Mutual Funds", f"PKR {metrics.mutual_funds:,.2f}")
+    col_c.metric("😔 Debit Savings", f"PKR {metrics.savings_debit:,.2f}")
 
 
 def render_all_data(df):
     """Render all data view"""
     st.subheader("All Transactions")
-    df_show = df.copy()
-    df_show["amount"] = df_show["amount"].map("PKR {:,.2f}".format)
-    st.dataframe(df_show.drop(columns=["id"]))
+    columns = [column for column in df.columns if column != "id"]
+    st.dataframe(display_frame(df, columns), column_config=TRANSACTION_COLUMN_CONFIG)
+
 
+def render_by_category(cube):
+    """Render by category view from the rollup cube"""
+    metrics = cube.metrics()
 
-def render_by_category(df):
-    """Render by category view"""
     st.subheader("Expenses by Category")
-    expense_df = df[df["type"] == "Expense"]
+    category_totals = metrics.category_totals("Expense")
 
-    if not expense_df.empty:
-        category_totals = expense_df.groupby("category")["amount"].sum().reset_index().sort_values("amount",
-                                                                                                   ascending=False)
+    if not category_totals.empty:
         st.bar_chart(category_totals.set_index("category"))
     else:
         st.info("No expenses recorded yet.")
 
     st.subheader("Income by Category")
-    income_df = df[df["type"] == "Income"]
+    income_category_totals = metrics.category_totals("Income")
 
-    if not income_df.empty:
-        income_category_totals = income_df.groupby("category")["amount"].sum().reset_index().sort_values("amount",
-                                                                                                         ascending=False)
+    if not income_category_totals.empty:
         st.bar_chart(income_category_totals.set_index("category"))
     else:
         st.info("No income recorded yet.")
 
-    if not expense_df.empty:
+    if not category_totals.empty:
         st.subheader("Expense Breakdown")
         exp_cols = st.columns(min(len(category_totals), 3))
         for i, (_, row) in enumerate(category_totals.iterrows()):
             exp_cols[i % len(exp_cols)].metric(label=row["category"], value=f"PKR {row['amount']:,.2f}")
 
-    if not income_df.empty:
+    if not income_category_totals.empty:
         st.subheader("Income Breakdown")
         inc_cols = st.columns(min(len(income_category_totals), 3))
         for i, (_, row) in enumerate(income_category_totals.iterrows()):
             inc_cols[i % len(inc_cols)].metric(label=row["category"], value=f"PKR {row['amount']:,.2f}")
 
 
-def render_delete(transactions, notion_service):
-    """Render delete transactions view"""
+@st.fragment
+def render_delete(df, notion_service):
+    """
+    Render delete transactions view: a searchable list paged DELETE_PAGE_SIZE rows at a time, with bulk archive.
+
+    Only the visible page is turned into widgets, so the view costs the same however long the history is.
+    """
     st.subheader("Delete Transactions")
 
-    def parse_date(date_value):
-        if isinstance(date_value, datetime):
-            return date_value
-        return pd.to_datetime(date_value, errors="coerce")
-
-    with st.expander("💸 Expenses", expanded=True):
-        expense_transactions = [{**t, "parsed_date": parse_date(t["date"])} for t in transactions if
-                                t["type"] == "Expense"]
-
-        if expense_transactions:
-            expense_df = pd.DataFrame(expense_transactions)
-            expense_df["month"] = expense_df["parsed_date"].dt.to_period("M")
-            expense_df = expense_df.sort_values("parsed_date", ascending=False)
-
-            for month, month_df in expense_df.groupby("month"):
-                with st.expander(f"📅 {month.strftime('%B %Y')}"):
-                    for idx, transaction in month_df.iterrows():
-                        st.markdown(
-                            f"**➖ {transaction['parsed_date'].strftime('%d %B %Y')} - {transaction['time']}**  \n"
-                            f"Category: {transaction['category']}  |  "
-                            f"Amount: PKR {transaction['amount']:,} | "
-                            f"Description: {transaction['description']} "
-                        )
-                        if st.button("🗑 Delete Expense", key=f"delete_exp_{transaction['id']}"):
-                            notion_service.delete_transaction(transaction["id"])
-                            st.success("Expense deleted successfully")
-                            time.sleep(1)
-                            st.rerun()
-        else:
-            st.info("No expenses recorded yet.")
-
-    with st.expander("🤑 Income", expanded=True):
-        income_transactions = [{**t, "parsed_date": parse_date(t["date"])} for t in transactions if
-                               t["type"] == "Income"]
-
-        if income_transactions:
-            income_df = pd.DataFrame(income_transactions)
-            income_df["month"] = income_df["parsed_date"].dt.to_period("M")
-            income_df = income_df.sort_values("parsed_date", ascending=False)
-
-            for month, month_df in income_df.groupby("month"):
-                with st.expander(f"📅 {month.strftime('%B %Y')}"):
-                    for idx, transaction in month_df.iterrows():
-                        st.markdown(
-                            f"**➕ {transaction['parsed_date'].strftime('%d %B %Y')} - {transaction['time']}**  \n"
-                            f"Category: {transaction['category']}  |  "
-                            f"Amount: PKR {transaction['amount']:,} | "
-                            f"Description: {transaction['description']} "
-                        )
-                        if st.button("🗑 Delete Income", key=f"delete_inc_{transaction['id']}"):
-                            notion_service.delete_transaction(transaction["id"])
-                            st.success("Income deleted successfully")
-                            time.sleep(1)
-                            st.rerun()
-        else:
-            st.info("No income recorded yet.")
+    if "delete_result" in st.session_state:
+        st.success(st.session_state.pop("delete_result"))
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        query = st.text_input("Search", placeholder="Category, description or amount", key="delete_query")
+    with col2:
+        selected_type = st.selectbox("Type", ["All", *TRANSACTION_TYPES], key="delete_type")
+
+    matches = df if selected_type == "All" else df[df["type"] == selected_type]
+    if query:
+        categories = [c for c in matches["category"].cat.categories if query.lower() in c.lower()]
+        matches = matches[
+            matches["category"].isin(categories)
+            | matches["description"].str.contains(query, case=False, regex=False).fillna(False)
+            | matches["amount"].astype(str).str.contains(query.replace(",", ""), regex=False)
+        ]
+
+    if matches.empty:
+        st.info("No transactions match your search.")
+        return
+
+    page_count = -(-len(matches) // DELETE_PAGE_SIZE)
+    # A narrower search can leave the remembered page past the end
+    if st.session_state.get("delete_page", 1) > page_count:
+        st.session_state["delete_page"] = page_count
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key="delete_page")
+
+    visible = matches.iloc[(page - 1) * DELETE_PAGE_SIZE:page * DELETE_PAGE_SIZE]
+    st.caption(f"Showing {len(visible)} of {len(matches)} matching transactions")
+
+    display_df = display_frame(visible, TRANSACTION_FIELDS, start=(page - 1) * DELETE_PAGE_SIZE + 1)
+    st.dataframe(display_df, column_config={
+        **TRANSACTION_COLUMN_CONFIG,
+        "date": st.column_config.DateColumn("Date", format="DD MMMM YYYY"),
+    })
+
+    # Undated rows sort last, so the final page can hold rows without a date
+    dates = visible["date"].dt.strftime("%d %b %Y").fillna("No date").to_numpy()
+    labels = {
+        transaction.id: f"{transaction.date} {transaction.time} | {transaction.type} | "
+                        f"{transaction.category} | PKR {transaction.amount:,}"
+        for transaction in visible.assign(date=dates, time=display_df["time"].to_numpy()).itertuples()
+    }
+    select_all = st.checkbox(f"Select all {len(matches)} matching transactions", key="delete_all")
+    if select_all:
+        selected_df = matches
+    else:
+        # Keyed by page and round, so a picked row never carries over to a different one
+        picked = st.multiselect("Transactions", list(labels), format_func=labels.get,
+                                key=f"delete_picked_{page}_{st.session_state.get('delete_round', 0)}")
+        selected_df = visible[visible["id"].isin(picked)]
+
+    if selected_df.empty:
+        return
+
+    if st.button(f"🗑 Archive {len(selected_df)} Transactions (PKR {selected_df['amount'].sum():,})",
+                 key="delete_transactions"):
+        progress = st.progress(0.0, text="Archiving...")
+        failed = notion_service.archive_transactions(
+            selected_df["id"].tolist(),
+            on_progress=lambda done, total: progress.progress(done / total, text=f"Archived {done}/{total}")
+        )
+        message = f"Deleted {len(selected_df) - len(failed)} transactions"
+        st.session_state["delete_round"] = st.session_state.get("delete_round", 0) + 1
+        if not failed:
+            # Rerun once for the whole batch so the list reflects the archive
+            st.session_state["delete_result"] = message
+            st.rerun()
+
+        st.success(message)
+        for transaction_id, error in failed:
+            st.error(f"Error deleting transaction {labels.get(transaction_id, transaction_id)}: {error}")
 
 
 def render_budget_overview_tab(notion_service):
@@ -533,49 +884,45 @@ def render_budget_overview_tab(notion_service):
     st.header("📊 Budget Overview")
 
     if st.button("🔄 Refresh Data"):
-        st.cache_data.clear()
-        st.rerun()
+        notion_service.refresh()
+    render_refresh_status(notion_service)
 
     view = st.radio("Select View", ["📅 By Month", "📊 Dashboard", "📋 All Data", "📈 By Category", "❌ Delete"],
-                    horizontal=True)
+                    horizontal=True, key="budget_view")
 
     if view == "📅 By Month":
         render_by_month(notion_service)
     else:
-        transactions = notion_service.get_transactions()
-
-        if transactions:
-            df = pd.DataFrame(transactions)
-            df.index = range(1, len(transactions) + 1)
+        df = load_transactions(notion_service)
 
+        if not df.empty:
             if view == "📊 Dashboard":
-                render_dashboard(df)
+                render_dashboard(notion_service.dataset.cube())
             elif view == "📋 All Data":
                 render_all_data(df)
             elif view == "📈 By Category":
-                render_by_category(df)
+                render_by_category(notion_service.dataset.cube())
             elif view == "❌ Delete":
-                render_delete(transactions, notion_service)
+                render_delete(df, notion_service)
         else:
             st.info("❌ No transactions recorded yet.")
 
 
+@st.fragment
 def render_search_filter_tab(notion_service):
-    """Render the Search & Filter tab"""
+    """Render the Search & Filter tab; a fragment, so changing a filter reruns only the panel and its results"""
     st.header("🔍 Search & Filter Transactions")
 
     if st.button("🔄 Refresh Data", key="refresh_search"):
-        st.cache_data.clear()
-        st.rerun()
-
-    transactions = notion_service.get_transactions()
+        notion_service.refresh()
+    render_refresh_status(notion_service)
 
-    if transactions:
-        df = pd.DataFrame(transactions)
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df = df.sort_values(by="date", ascending=False)
+    df = load_transactions(notion_service)
 
+    if not df.empty:
         st.subheader("Filter Options")
+        search_text = st.text_input("Search description or category",
+                                    placeholder="e.g. groc matches Grocery, Groceries", key="search_text")
         filter_col1, filter_col2 = st.columns(2)
 
         with filter_col1:
@@ -604,43 +951,39 @@ def render_search_filter_tab(notion_service):
             categories = ["All"] + sorted(df["category"].unique().tolist())
             selected_category = st.selectbox("Select Category", categories)
 
-        filtered_df = df.copy()
-        if use_date_range:
-            filtered_df = filtered_df[
-                (filtered_df["date"].dt.date >= date_from) & (filtered_df["date"].dt.date <= date_to)]
-        if use_amount_range:
-            filtered_df = filtered_df[
-                (filtered_df["amount"] >= amount_range[0]) & (filtered_df["amount"] <= amount_range[1])]
-        if selected_type != "All":
-            filtered_df = filtered_df[filtered_df["type"] == selected_type]
-        if selected_category != "All":
-            filtered_df = filtered_df[filtered_df["category"] == selected_category]
+        # Only the matching rows are read, from the sorted dataset indexes or straight from Notion
+        filtered_df = notion_service.search_transactions(
+            date_from=date_from if use_date_range else None,
+            date_to=date_to if use_date_range else None,
+            amount_min=amount_range[0] if use_amount_range else None,
+            amount_max=amount_range[1] if use_amount_range else None,
+            transaction_type=None if selected_type == "All" else selected_type,
+            category=None if selected_category == "All" else selected_category,
+        )
+        if search_text.strip():
+            # Word search runs on the token index; its ids are intersected with the filtered rows
+            matching_ids = notion_service.dataset.search(search_text) & set(filtered_df["id"])
+            filtered_df = filtered_df[filtered_df["id"].isin(matching_ids)]
 
         st.subheader(f"Results ({len(filtered_df)} transactions found)")
 
         if not filtered_df.empty:
             col1, col2 = st.columns(2)
-            total_income = filtered_df[filtered_df["type"] == "Income"]["amount"].sum()
-            total_expense = filtered_df[filtered_df["type"] == "Expense"]["amount"].sum()
-            total_savings = filtered_df[filtered_df["category"] == "Savings"]["amount"].sum()
-            debit_savings = filtered_df[filtered_df["type"] == "Savings Debit"]["amount"].sum()
-            net_savings = total_savings - debit_savings
-            net_balance = total_income - total_expense
+            metrics = budget_metrics(filtered_df)
 
             with col1:
-                st.metric("💰 Total Income", f"PKR {total_income:,.2f}")
-                st.metric("💸 Total Expenses", f"PKR {total_expense:,.2f}")
-                st.metric("🤑 Total Savings", f"PKR {net_savings:,.2f}")
+                st.metric("💰 Total Income", f"PKR {metrics.income:,.2f}")
+                st.metric("💸 Total Expenses", f"PKR {metrics.expense:,.2f}")
+                st.metric("🤑 Total Savings", f"PKR {metrics.net_savings:,.2f}")
 
             with col2:
-                st.metric("💵 Net Balance", f"PKR {net_balance:,.2f}")
-                st.metric("📊 Count", len(filtered_df))
+                st.metric("💵 Net Balance", f"PKR {metrics.net_balance:,.2f}")
+                st.metric("📊 Count", metrics.count)
 
-            filtered_df["date_display"] = filtered_df["date"].dt.strftime("%d-%B-%Y")
-            display_df = filtered_df[["date_display", "time", "type", "category", "amount", "description"]].copy()
-            display_df.columns = ["Date", "Time", "Type", "Category", "Amount (PKR)", "Description"]
-            display_df.index = range(1, len(display_df) + 1)
-            st.dataframe(display_df, width="stretch")
+            st.dataframe(display_frame(filtered_df, TRANSACTION_FIELDS), width="stretch", column_config={
+                **TRANSACTION_COLUMN_CONFIG,
+                "date": st.column_config.DateColumn("Date", format="DD-MMMM-YYYY"),
+            })
 
             st.subheader("Visual Analysis")
             chart_col1, chart_col2 = st.columns(2)
@@ -653,13 +996,12 @@ def render_search_filter_tab(notion_service):
 
             with chart_col2:
                 st.write("**Amount by Category**")
-                category_chart = filtered_df.groupby("category")["amount"].sum().reset_index().sort_values("amount",
-                                                                                                           ascending=False)
+                category_chart = metrics.category_totals()
                 st.bar_chart(category_chart.set_index("category"))
 
             if selected_type == "All":
                 st.subheader("Income vs Expenses vs Savings Debit")
-                type_summary = filtered_df.groupby("type")["amount"].sum().reset_index()
+                type_summary = metrics.type_totals()
                 st.bar_chart(type_summary.set_index("type"))
         else:
             st.info("No transactions match your filters.")
@@ -686,16 +1028,20 @@ def main():
         st.rerun()
 
     notion_service = NotionService()
-    main_tabs = st.tabs(["💸 Add Transaction", "📊 View Budget", "🔍 Search & Filter"])
-
-    with main_tabs[0]:
-        render_add_transaction_tab(notion_service)
-
-    with main_tabs[1]:
-        render_budget_overview_tab(notion_service)
-
-    with main_tabs[2]:
-        render_search_filter_tab(notion_service)
+    sections = {
+        "💸 Add Transaction": render_add_transaction_tab,
+        "📊 View Budget": render_budget_overview_tab,
+        "🔍 Search & Filter": render_search_filter_tab,
+    }
+
+    # Widgets of a hidden section drop their state; carry the chosen view over
+    if "budget_view" in st.session_state:
+        st.session_state["budget_view"] = st.session_state["budget_view"]
+
+    # Unlike st.tabs, only the selected section runs on a rerun
+    section = st.radio("Section", list(sections), horizontal=True, key="section", label_visibility="collapsed")
+    st.divider()
+    sections[section](notion_service)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+import asyncio
+import queue
+import threading
+
+from notion_scheduler import ScheduledAsyncClient
+
+
+async def aiter_pages(client, data_source_id, **params):
+    """
+    Yield every page of a data source query with an AsyncClient.
+
+    The request for the next cursor is already in flight while the caller handles the
+    rows of the current one, so network waits overlap with row parsing.
+    """
+    def request(start_cursor=None):
+        query_params = {"data_source_id": data_source_id, "page_size": 100, **params}
+        if start_cursor:
+            query_params["start_cursor"] = start_cursor
+        return asyncio.ensure_future(client.data_sources.query(**query_params))
+
+    pending = request()
+    while pending:
+        data = await pending
+        pending = request(data.get("next_cursor")) if data.get("has_more") else None
+
+        for page in data["results"]:
+            yield page
+
+
+async def aproperty_ids(client, data_source_id, names):
+    """Resolve property names to the IDs accepted by the filter_properties query parameter"""
+    schema = (await client.data_sources.retrieve(data_source_id))["properties"]
+    return [schema[name]["id"] for name in names]
+
+
+async def aquery_rows(client, data_source_id, parse_row=None, properties=None, **params):
+    """
+    Return every page of a query, parsed with parse_row when given.
+
+    Args:
+        properties: Notion property names to fetch. If given, the query is projected onto
+            them and every other property is left out of the response.
+    """
+    if properties:
+        params["filter_properties"] = await aproperty_ids(client, data_source_id, properties)
+
+    if parse_row is None:
+        return [page async for page in aiter_pages(client, data_source_id, **params)]
+    return [parse_row(page) async for page in aiter_pages(client, data_source_id, **params)]
+
+
+async def aquery_sources(queries):
+    """
+    Run several data source queries at the same time.
+
+    Args:
+        queries: Mapping of name to a dict with "auth", "data_source_id" and optionally
+            "parse_row", "properties" and "params" (extra data_sources.query arguments).
+
+    Returns:
+        Mapping of the same names to their rows.
+    """
+    clients = {}
+    try:
+        tasks = []
+        for query in queries.values():
+            auth = query["auth"]
+            if auth not in clients:
+                clients[auth] = ScheduledAsyncClient(auth=auth)
+            tasks.append(aquery_rows(
+                clients[auth], query["data_source_id"], query.get("parse_row"), query.get("properties"),
+                **query.get("params", {})
+            ))
+        results = await asyncio.gather(*tasks)
+    finally:
+        for client in clients.values():
+            await client.aclose()
+
+    return dict(zip(queries, results))
+
+
+def query_sources(queries):
+    """Blocking facade over aquery_sources for callers without an event loop"""
+    return asyncio.run(aquery_sources(queries))
+
+
+def iter_rows(auth, data_source_id, parse_row=None, properties=None, **params):
+    """
+    Blocking generator over every page of a single query, parsed with parse_row when given.
+
+    The query runs on an event loop in a background thread, so rows are handed over as
+    each response lands instead of after the last one.
+    """
+    rows = queue.Queue(maxsize=1000)
+    finished = object()
+
+    async def produce():
+        async with ScheduledAsyncClient(auth=auth) as client:
+            if properties:
+                params["filter_properties"] = await aproperty_ids(client, data_source_id, properties)
+            async for page in aiter_pages(client, data_source_id, **params):
+                rows.put(parse_row(page) if parse_row else page)
+
+    def run():
+        try:
+            asyncio.run(produce())
+            rows.put(finished)
+        except Exception as e:
+            rows.put(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    while True:
+        row = rows.get()
+        if row is finished:
+            return
+        if isinstance(row, Exception):
+            raise row
+        yield row
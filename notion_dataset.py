@@ -0,0 +1,345 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from notion_frames import ColumnarDecoder
+from notion_index import SortedIndex, TokenIndex
+from notion_metrics import RollupCube
+
+# Seconds after which a read starts a background sync
+MAX_AGE = 300
+
+
+class NotionDataset:
+    """
+    Typed, in-memory copy of a mirrored data source, persisted as a Parquet snapshot.
+
+    After a restart the snapshot is loaded straight into a DataFrame, so the apps can
+    render before talking to Notion. The frame is kept sorted by date, newest first, so a
+    date range is one contiguous slice found by binary search, and a sorted amount index
+    does the same for amount ranges; switching months, years or search filters never
+    queries Notion. Reads are stale-while-revalidate: the last good frame
+    is always served at once, and once it is older than MAX_AGE a delta sync runs in a
+    background thread. When that changes the mirror, the frame is rebuilt. Local writes
+    are patched into the frame instead: their rows are dropped and re-inserted at their
+    date position. Either way the snapshot is rewritten in a background thread. A
+    RollupCube of the frame is kept for charts and totals; it is rebuilt only when the
+    version changes, and local writes re-aggregate just the months they touched. A
+    TokenIndex over the text fields backs word search the same way: built once per
+    version, with local writes re-indexing only their rows.
+    """
+
+    def __init__(self, mirror, schema, columns, dimensions=(), text_fields=(), on_change=None):
+        """
+        Args:
+            mirror: NotionMirror of the data source.
+            schema: Mapping of row field to (property name, reader), as in notion_schema.
+            columns: Mapping of row field to column kind, as in notion_frames.
+            dimensions: Columns the rollup cube breaks each month down by (e.g., ("type", "category")).
+            text_fields: Columns whose words the token index makes searchable (e.g., ("description",)).
+            on_change: Called without arguments after a background sync changed the frame.
+        """
+        self.mirror = mirror
+        self.schema = schema
+        self.columns = columns
+        self.dimensions = dimensions
+        self.text_fields = text_fields
+        self.on_change = on_change
+        self.path = os.path.join(os.path.dirname(mirror.path), f"{mirror.data_source_id}.parquet")
+        # Snapshots written for another set of fields or column kinds are not reused
+        self.format = json.dumps([list(schema), columns], sort_keys=True)
+        self.version = None
+        self.error = None
+        self.refreshed_at = None
+        self._frame = None
+        self._date_keys = None
+        self._by_amount = None
+        self._cube = None
+        self._index = None
+        self._lock = threading.Lock()
+        self._reconciling = None
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_version = None
+
+    def _load_snapshot(self):
+        """Return (frame, version) from the snapshot, or (None, None) if there is no usable one"""
+        try:
+            table = pq.read_table(self.path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None, None
+        metadata = table.schema.metadata or {}
+        if metadata.get(b"notion_format", b"").decode() != self.format:
+            return None, None
+        self.refreshed_at = os.path.getmtime(self.path)
+        frame = table.to_pandas()
+        # Parquet keeps the string type but not its pyarrow storage
+        for field, kind in self.columns.items():
+            if kind == "string" and field in frame:
+                frame[field] = frame[field].astype("string[pyarrow]")
+        return frame, metadata[b"notion_version"].decode()
+
+    def _save_snapshot(self, frame, version):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"notion_version": version.encode(),
+            b"notion_format": self.format.encode(),
+        })
+        # Write next to the snapshot and swap it in, so readers never see a partial file
+        pq.write_table(table, self.path + ".tmp")
+        os.replace(self.path + ".tmp", self.path)
+
+    def _save_snapshot_later(self, frame, version):
+        """Write the snapshot in a background thread, so no read or write waits on Parquet"""
+        self._snapshot_version = version
+
+        def save():
+            with self._snapshot_lock:
+                # A newer frame has its own snapshot on the way
+                if version == self._snapshot_version:
+                    self._save_snapshot(frame, version)
+
+        threading.Thread(target=save, daemon=True).start()
+
+    def _build(self):
+        """Decode the whole mirror into a frame and snapshot it, returning (frame, version)"""
+        version = self.mirror.version()
+        decoder = ColumnarDecoder(self.schema, self.columns)
+        decoder.append_records(self.mirror.records(decoder.fields))
+        frame = decoder.frame()
+        self._save_snapshot_later(frame, version)
+        return frame, version
+
+    def is_ready(self):
+        """Whether frame() can answer without downloading the full history first"""
+        return self._frame is not None or os.path.exists(self.path) or self.mirror.is_warm()
+
+    def _set_frame(self, frame, version):
+        """Swap in a new frame, sorted newest first, and its date and amount indexes; call with the lock held"""
+        # Undated rows go last, where no date range can reach them
+        frame = frame.sort_values("date", ascending=False, kind="stable", na_position="last").reset_index(drop=True)
+        dated = int(frame["date"].notna().sum())
+        # Dates of the dated rows oldest first, the order searchsorted needs
+        self._date_keys = frame["date"].to_numpy()[:dated][::-1]
+        self._by_amount = SortedIndex(frame["amount"])
+        self._frame, self.version = frame, version
+
+    def _date_bounds(self, start=None, end=None):
+        """Return the (first, stop) frame positions of the dated rows from start through end; call with the lock held"""
+        keys = self._date_keys
+        first = len(keys) - np.searchsorted(keys, pd.Timestamp(end).to_datetime64(), side="right") if end else 0
+        stop = len(keys) - np.searchsorted(keys, pd.Timestamp(start).to_datetime64(), side="left") if start \
+            else len(keys)
+        return int(first), int(stop)
+
+    def _load(self):
+        """Load the frame on first use; call with the lock held"""
+        if self._frame is None:
+            frame, version = self._load_snapshot()
+            if frame is None or (self.mirror.is_warm() and version != self.mirror.version()):
+                if not self.mirror.is_warm():
+                    self.mirror.sync()
+                frame, version = self._build()
+            self._set_frame(frame, version)
+
+    def frame(self):
+        """
+        Return the full dataset as a typed DataFrame, newest first.
+
+        The first call in a process serves the snapshot when the mirror has nothing newer,
+        and otherwise rebuilds from the mirror, running a full sync first if it is empty.
+        """
+        with self._lock:
+            self._load()
+            return self._frame
+
+    def select(self, start=None, end=None, amount_min=None, amount_max=None):
+        """
+        Return the rows dated start through end with an amount in range, newest first.
+
+        The date range is one slice of the date-sorted frame and the amount range one run of
+        the sorted amount index, both found by binary search. When both are given, the
+        narrower one is cut first and the other is only checked on its rows.
+
+        Args:
+            start: First date to include (datetime.date). If None, the range is open at the start.
+            end: Last date to include (datetime.date). If None, the range is open at the end.
+            amount_min: Smallest amount to include. If None, the range is open at the bottom.
+            amount_max: Largest amount to include. If None, the range is open at the top.
+        """
+        dated = start is not None or end is not None
+        with self._lock:
+            self._load()
+            frame, by_amount = self._frame, self._by_amount
+            first, stop = self._date_bounds(start, end) if dated else (0, len(frame))
+        if amount_min is None and amount_max is None:
+            return frame.iloc[first:stop].reset_index(drop=True) if dated else frame
+
+        positions = by_amount.positions(amount_min, amount_max)
+        if stop - first < len(positions):
+            rows = frame.iloc[first:stop]
+            amounts = rows["amount"].to_numpy()
+            keep = np.ones(len(rows), dtype=bool)
+            if amount_min is not None:
+                keep &= amounts >= amount_min
+            if amount_max is not None:
+                keep &= amounts <= amount_max
+            return rows[keep].reset_index(drop=True)
+        # Back to frame order, so the rows stay newest first
+        positions = np.sort(positions[(positions >= first) & (positions < stop)])
+        return frame.iloc[positions].reset_index(drop=True)
+
+    def cube(self):
+        """Return the RollupCube of the current frame, rebuilding it only when the version changed"""
+        with self._lock:
+            self._load()
+            if self._cube is None or self._cube.version != self.version:
+                self._cube = RollupCube(self._frame, self.dimensions, self.version)
+            return self._cube
+
+    def text_index(self):
+        """Return the TokenIndex of the current frame, rebuilding it only when the version changed"""
+        with self._lock:
+            self._load()
+            if self._index is None or self._index.version != self.version:
+                self._index = TokenIndex(self._frame, self.text_fields, self.version)
+            return self._index
+
+    def search(self, query):
+        """Return the ids of the rows whose text fields contain every word of query as a prefix"""
+        return self.text_index().search(query)
+
+    def _month_rows(self, year, month):
+        """Rows of one month, or the undated rows for (0, 0); call with the lock held"""
+        if not year:
+            return self._frame.iloc[len(self._date_keys):]
+        start = pd.Timestamp(year, month, 1)
+        first, stop = self._date_bounds(start, start + pd.offsets.MonthEnd())
+        return self._frame.iloc[first:stop]
+
+    def reload(self):
+        """Rebuild the frame and snapshot from the mirror"""
+        with self._lock:
+            self._set_frame(*self._build())
+
+    def _patch_frame(self, rows, ids, version):
+        """
+        Replace the rows with the given ids by the decoded rows, keeping the frame newest first.
+
+        The remaining rows keep their order; each new row is inserted at the position a
+        binary search over the date keys finds for it, and the amount index is remapped
+        rather than sorted again. Call with the lock held.
+        """
+        frame = self._frame
+        kept_positions = np.flatnonzero(~frame["id"].isin(ids).to_numpy())
+        kept = frame.iloc[kept_positions]
+        decoder = ColumnarDecoder(self.schema, self.columns)
+        decoder.append_records([(row["id"], *(row.get(field) for field in decoder.fields)) for row in rows])
+        added = decoder.frame().sort_values("date", ascending=False, kind="stable", na_position="last")
+
+        kept_dates = kept["date"].to_numpy()
+        dated = int((~np.isnat(kept_dates)).sum())
+        added_dates = added["date"].to_numpy()
+        # Rows newer than each new row come before it; undated rows go last
+        at = np.where(np.isnat(added_dates), len(kept),
+                      dated - np.searchsorted(kept_dates[:dated][::-1], added_dates, side="right"))
+        order = np.insert(np.arange(len(kept)), at, len(kept) + np.arange(len(added)))
+        combined = pd.concat([kept, added], ignore_index=True) if len(added) else kept.reset_index(drop=True)
+        for field, kind in self.columns.items():
+            # Categoricals with different categories concatenate to object
+            if kind == "category" and combined[field].dtype != "category":
+                combined[field] = combined[field].astype("category")
+        patched = combined.iloc[order].reset_index(drop=True)
+
+        if patched["amount"].dtype == frame["amount"].dtype:
+            new_positions = np.empty(len(order), dtype=np.intp)
+            new_positions[order] = np.arange(len(order))
+            moves = np.full(len(frame), -1, dtype=np.intp)
+            moves[kept_positions] = new_positions[:len(kept)]
+            self._by_amount.update(moves, new_positions[len(kept):], added["amount"].to_numpy())
+        else:
+            self._by_amount = SortedIndex(patched["amount"])
+        dated += int((~np.isnat(added_dates)).sum())
+        self._date_keys = patched["date"].to_numpy()[:dated][::-1]
+        self._frame, self.version = patched, version
+
+    def apply(self, pages):
+        """
+        Write pages returned by pages.create / pages.update through the mirror into the dataset.
+
+        When the mirror held exactly this dataset's version before the write, only the
+        written rows are patched into the frame, a current rollup cube re-aggregates only
+        their months and a current token index re-indexes only those rows. If a background
+        sync changed the mirror in between, the frame is rebuilt and the cube and index
+        are dropped, to be rebuilt on next use.
+
+        Args:
+            pages: Pages returned by the Notion API; archived or trashed ones are removed.
+        """
+        if not pages:
+            return
+        rows, removed, before, after = self.mirror.apply_all(pages)
+        with self._lock:
+            if self._frame is None:
+                # Nothing loaded yet; the first read builds the frame from the mirror
+                return
+            previous = self.version
+            if before != previous:
+                self._set_frame(*self._build())
+                self._cube = self._index = None
+                return
+            ids = {row["id"] for row in rows}
+            live_ids = ids.difference(removed)
+            # Months the written rows were in before the write, in case an edit moved them
+            old_dates = self._frame.loc[self._frame["id"].isin(ids), "date"]
+            self._patch_frame([row for row in rows if row["id"] in live_ids], ids, after)
+            self._save_snapshot_later(self._frame, after)
+            if self._index is not None and self._index.version == previous:
+                self._index.update(rows, live_ids, after)
+            if self._cube is None or self._cube.version != previous:
+                return
+            dates = pd.to_datetime(pd.Series([row.get("date") for row in rows], dtype=object).str.slice(0, 10),
+                                   format="%Y-%m-%d", errors="coerce")
+            months = {(0, 0) if pd.isna(d) else (d.year, d.month) for d in [*dates, *old_dates]}
+            touched = pd.concat([self._month_rows(*month) for month in months]).reset_index(drop=True)
+            self._cube.update(touched, months, after)
+
+    def _reconcile(self):
+        try:
+            self.mirror.sync()
+            if self.mirror.version() != self.version:
+                self.reload()
+                if self.on_change:
+                    self.on_change()
+            self.error = None
+            self.refreshed_at = time.time()
+        except Exception as e:
+            self.error = e
+
+    def reconcile(self):
+        """Start a delta sync in a background thread, unless one is already running"""
+        with self._lock:
+            if self._reconciling and self._reconciling.is_alive():
+                return
+            self._reconciling = threading.Thread(target=self._reconcile, daemon=True)
+            self._reconciling.start()
+
+    def is_refreshing(self):
+        """Whether a background sync is running"""
+        return bool(self._reconciling and self._reconciling.is_alive())
+
+    def age(self):
+        """Seconds since the data was last confirmed current with Notion, or None if never"""
+        return None if self.refreshed_at is None else time.time() - self.refreshed_at
+
+    def revalidate(self, max_age=MAX_AGE):
+        """Start a background sync if the data is older than max_age seconds; never blocks"""
+        age = self.age()
+        if age is None or age > max_age:
+            self.reconcile()
@@ -0,0 +1,117 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+HISTORY_START = date(2025, 1, 1)
+MAX_CONCURRENT_QUERIES = 3
+DATE_ASCENDING = [{"property": "Date", "direction": "ascending"}]
+
+
+def property_ids(client, data_source_id, names):
+    """
+    Resolve property names to the IDs accepted by the filter_properties query parameter.
+
+    Projecting a query onto these IDs makes Notion leave every other property out of
+    the returned pages.
+    """
+    schema = client.data_sources.retrieve(data_source_id)["properties"]
+    return [schema[name]["id"] for name in names]
+
+
+def iter_batches(client, data_source_id, **params):
+    """Yield the pages of each response of a data source query as it arrives, following the cursor chain"""
+    start_cursor = None
+
+    while True:
+        query_params = {"data_source_id": data_source_id, "page_size": 100, **params}
+        if start_cursor:
+            query_params["start_cursor"] = start_cursor
+
+        data = client.data_sources.query(**query_params)
+        yield data["results"]
+
+        if not data.get("has_more"):
+            return
+        start_cursor = data.get("next_cursor")
+
+
+def iter_pages(client, data_source_id, **params):
+    """Yield every page of a data source query, following the cursor chain"""
+    for batch in iter_batches(client, data_source_id, **params):
+        yield from batch
+
+
+def query_all(client, data_source_id, **params):
+    """Return every page of a data source query"""
+    return list(iter_pages(client, data_source_id, **params))
+
+
+def next_month(day):
+    """Return the first day of the month after the given date"""
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def month_partitions(start=HISTORY_START, end=None):
+    """
+    Split the Date property into one filter per month from start through end.
+
+    Two catch-all filters for undated rows and rows before start, and one for rows after
+    end, are added so the partitions together still cover the whole data source.
+    """
+    end = end or date.today()
+    lower = start.replace(day=1)
+
+    partitions = [
+        {"property": "Date", "date": {"is_empty": True}},
+        {"property": "Date", "date": {"before": lower.isoformat()}},
+    ]
+    while lower <= end:
+        upper = next_month(lower)
+        partitions.append({
+            "and": [
+                {"property": "Date", "date": {"on_or_after": lower.isoformat()}},
+                {"property": "Date", "date": {"before": upper.isoformat()}},
+            ]
+        })
+        lower = upper
+    partitions.append({"property": "Date", "date": {"on_or_after": lower.isoformat()}})
+
+    return partitions
+
+
+def iter_partitioned(client, data_source_id, partitions, max_workers=MAX_CONCURRENT_QUERIES, **params):
+    """
+    Run one query per partition filter in a bounded thread pool, yielding each response's
+    pages as soon as it lands.
+
+    Each partition is sorted by Date, but batches come out in arrival order, so callers
+    that need the rows in date order must sort them.
+    """
+    batches = queue.Queue()
+    finished = object()
+
+    def fetch(partition):
+        try:
+            for batch in iter_batches(client, data_source_id, filter=partition, sorts=DATE_ASCENDING, **params):
+                batches.put(batch)
+        finally:
+            batches.put(finished)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch, partition) for partition in partitions]
+        try:
+            remaining = len(futures)
+            while remaining:
+                batch = batches.get()
+                if batch is finished:
+                    remaining -= 1
+                else:
+                    yield batch
+        finally:
+            for future in futures:
+                future.cancel()
+
+        for future in futures:
+            future.result()
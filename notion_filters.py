@@ -0,0 +1,64 @@
+import calendar
+from datetime import date
+
+
+def all_of(conditions):
+    """Combine filter conditions with a Notion "and" compound filter; None when there are none"""
+    conditions = [c for c in conditions if c]
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    # Flatten nested "and" filters; Notion only allows two levels of nesting
+    return {"and": [part for c in conditions for part in c.get("and", [c])]}
+
+
+def date_range_filter(start=None, end=None):
+    """
+    Filter the Date property to an inclusive range with its native on_or_after/on_or_before conditions.
+
+    Args:
+        start: First date to include (datetime.date). If None, the range is open at the start.
+        end: Last date to include (datetime.date). If None, the range is open at the end.
+
+    Returns:
+        The filter, or None for an unbounded range.
+    """
+    return all_of([
+        start and {"property": "Date", "date": {"on_or_after": start.isoformat()}},
+        end and {"property": "Date", "date": {"on_or_before": end.isoformat()}},
+    ])
+
+
+def month_range(year, month):
+    """Return the first and last date of a calendar month"""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def search_filter(date_from=None, date_to=None, amount_min=None, amount_max=None, transaction_type=None,
+                  category=None):
+    """
+    Translate Search & Filter choices into one Notion filter.
+
+    Args:
+        date_from: First date to include (datetime.date).
+        date_to: Last date to include (datetime.date).
+        amount_min: Smallest amount to include.
+        amount_max: Largest amount to include.
+        transaction_type: Type select option to match (e.g., "Expense").
+        category: Category text to match exactly.
+
+    Returns:
+        The filter, or None when nothing is filtered.
+    """
+    conditions = [date_range_filter(date_from, date_to)]
+    if amount_min is not None:
+        conditions.append({"property": "Amount", "number": {"greater_than_or_equal_to": amount_min}})
+    if amount_max is not None:
+        conditions.append({"property": "Amount", "number": {"less_than_or_equal_to": amount_max}})
+    if transaction_type:
+        conditions.append({"property": "Type", "select": {"equals": transaction_type}})
+    if category:
+        conditions.append({"property": "Category", "rich_text": {"equals": category}})
+    return all_of(conditions)
+
@@ -0,0 +1,96 @@
+import pandas as pd
+
+# Row field -> column kind; fields not listed stay plain object columns
+TRANSACTION_COLUMNS = {
+    "date": "datetime",
+    "time": "minutes",
+    "type": "category",
+    "category": "category",
+    "amount": "int64",
+    "month": "category",
+    "description": "string",
+}
+
+RIDE_COLUMNS = {
+    "date": "datetime",
+    "time": "minutes",
+    "amount": "int64",
+    "month": "category",
+}
+
+# Format of the Time property, as written by the apps
+TIME_FORMAT = "%I:%M %p"
+
+
+def typed_column(values, kind):
+    """Turn a list of decoded values into a typed column"""
+    if kind == "datetime":
+        return pd.to_datetime(pd.Series(values, dtype=object).str.slice(0, 10), format="%Y-%m-%d", errors="coerce")
+    if kind == "minutes":
+        # Minutes since midnight; "Unknown" and unparseable times become <NA>
+        times = pd.to_datetime(pd.Series(values, dtype=object), format=TIME_FORMAT, errors="coerce")
+        return (times.dt.hour * 60 + times.dt.minute).astype("Int16")
+    if kind == "category":
+        return pd.Categorical(values)
+    if kind == "string":
+        return pd.Series(values, dtype="string[pyarrow]")
+    if kind == "int64":
+        amounts = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").fillna(0)
+        return amounts.astype("int64") if (amounts % 1 == 0).all() else amounts.astype("float64")
+    return pd.Series(values, dtype=object)
+
+
+def format_minutes(minutes, missing="Unknown"):
+    """Format a minutes-since-midnight column as Time property text (e.g., "02:30 PM") for display"""
+    times = pd.to_datetime(minutes.astype("float64") * 60, unit="s")
+    return times.dt.strftime(TIME_FORMAT).fillna(missing)
+
+
+def display_frame(df, columns, start=1):
+    """
+    Pick columns of a typed frame for st.dataframe, numbering rows from start.
+
+    Columns are passed through without a copy, leaving dates and amounts numeric for a
+    column_config to format in the browser; only the minutes time column becomes text.
+    """
+    shown = pd.DataFrame({
+        column: format_minutes(df[column]) if column == "time" else df[column] for column in columns
+    }, copy=False)
+    shown.index = range(start, start + len(shown))
+    return shown
+
+
+class ColumnarDecoder:
+    """Decode Notion pages or mirrored records straight into per-column arrays"""
+
+    def __init__(self, schema, columns, fields=None):
+        """
+        Args:
+            schema: Mapping of row field to (property name, reader), as in notion_schema.
+            columns: Mapping of row field to column kind ("datetime", "minutes", "category", "int64", "string").
+            fields: Row fields to decode. If None, decodes every field of the schema.
+        """
+        self.fields = list(fields or schema)
+        self.kinds = columns
+        self.readers = [schema[field] for field in self.fields]
+        self.columns = {"id": [], **{field: [] for field in self.fields}}
+        self._targets = [(self.columns[field], name, read)
+                         for field, (name, read) in zip(self.fields, self.readers)]
+
+    def append_page(self, page):
+        """Append one Notion page without building an intermediate row dict"""
+        props = page["properties"]
+        self.columns["id"].append(page["id"])
+        for values, name, read in self._targets:
+            values.append(read(props[name]))
+
+    def append_records(self, records):
+        """Append (id, *fields) tuples, such as those returned by NotionMirror.records"""
+        for values, column in zip(self.columns.values(), zip(*records)):
+            values.extend(column)
+
+    def frame(self):
+        """Build one typed DataFrame from everything appended so far"""
+        return pd.DataFrame({
+            field: typed_column(values, self.kinds.get(field)) for field, values in self.columns.items()
+        })
@@ -0,0 +1,139 @@
+import bisect
+import re
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens; missing text has none"""
+    if not isinstance(text, str):
+        return set()
+    return set(_TOKEN.findall(text.lower()))
+
+
+class TokenIndex:
+    """
+    Inverted index from word tokens of some text columns to the ids of the rows holding them.
+
+    A search looks up each query word as a prefix in the sorted token list and intersects
+    the posting sets, so its cost depends on the number of matching tokens and rows rather
+    than on the length of the history.
+    """
+
+    def __init__(self, frame, fields, version=None):
+        """
+        Args:
+            frame: Typed DataFrame with an "id" column and the text fields.
+            fields: Columns whose words are indexed (e.g., ("description", "category")).
+            version: Dataset version the index was built from.
+        """
+        self.fields = list(fields)
+        self.version = version
+        self.postings = {}
+        self.tokens_by_id = {}
+        columns = [frame[field].astype(object) for field in self.fields]
+        for row_id, *texts in zip(frame["id"], *columns):
+            self._add(row_id, set().union(*(tokenize(text) for text in texts)))
+        self.tokens = sorted(self.postings)
+
+    def _add(self, row_id, tokens):
+        self.tokens_by_id[row_id] = tokens
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(row_id)
+
+    def _remove(self, row_id):
+        for token in self.tokens_by_id.pop(row_id, ()):
+            ids = self.postings[token]
+            ids.discard(row_id)
+            if not ids:
+                del self.postings[token]
+
+    def update(self, rows, live_ids, version):
+        """
+        Re-index the rows touched by a local write instead of rebuilding the index.
+
+        Args:
+            rows: Row dicts the write added, edited or removed.
+            live_ids: Ids of those rows still in the dataset after the write.
+            version: Dataset version after the write.
+        """
+        for row in rows:
+            self._remove(row["id"])
+            if row["id"] in live_ids:
+                self._add(row["id"], set().union(*(tokenize(row.get(field)) for field in self.fields)))
+        self.tokens = sorted(self.postings)
+        self.version = version
+
+    def _prefixed(self, prefix):
+        """Ids of the rows holding any token that starts with prefix"""
+        ids = set()
+        for token in self.tokens[bisect.bisect_left(self.tokens, prefix):]:
+            if not token.startswith(prefix):
+                break
+            ids |= self.postings[token]
+        return ids
+
+    def search(self, query):
+        """
+        Return the ids of the rows containing every word of query as a word prefix.
+
+        Matching is case-insensitive, so "gro sto" finds "Grocery store". A query without
+        words matches nothing.
+        """
+        matches = None
+        for prefix in sorted(tokenize(query), key=len, reverse=True):
+            ids = self._prefixed(prefix)
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                break
+        return matches or set()
+
+
+class SortedIndex:
+    """
+    Row positions of a column ordered by value, so value ranges are found by binary search.
+
+    A lookup costs two searchsorted calls plus the size of its result, instead of a
+    comparison per row.
+    """
+
+    def __init__(self, values):
+        """
+        Args:
+            values: Column to index (e.g., the "amount" Series of a frame).
+        """
+        values = np.asarray(values)
+        self.order = np.argsort(values, kind="stable")
+        self.keys = values[self.order]
+
+    def update(self, moves, added_positions, added_values):
+        """
+        Re-index after rows were removed, inserted or moved, without sorting the column again.
+
+        Args:
+            moves: New position of every indexed row, by old position; -1 for removed rows.
+            added_positions: Positions of the inserted rows.
+            added_values: Values of the inserted rows, in the same order.
+        """
+        order = moves[self.order]
+        kept = order >= 0
+        order, keys = order[kept], self.keys[kept]
+        added_values = np.asarray(added_values)
+        by_value = np.argsort(added_values, kind="stable")
+        at = np.searchsorted(keys, added_values[by_value], side="right")
+        self.order = np.insert(order, at, np.asarray(added_positions)[by_value])
+        self.keys = np.insert(keys, at, added_values[by_value])
+
+    def positions(self, low=None, high=None):
+        """
+        Return the positions of the rows whose value lies between low and high, in value order.
+
+        Args:
+            low: Smallest value to include. If None, the range is open at the bottom.
+            high: Largest value to include. If None, the range is open at the top.
+        """
+        first = 0 if low is None else np.searchsorted(self.keys, low, side="left")
+        stop = len(self.keys) if high is None else np.searchsorted(self.keys, high, side="right")
+        return self.order[first:stop]
@@ -0,0 +1,149 @@
+import pandas as pd
+
+
+class BudgetMetrics:
+    """
+    Income, expense, savings and investment figures of a set of transactions.
+
+    Everything is derived from one table of amount sums and row counts per (type,
+    category), so the transactions are scanned once however many figures a view shows.
+    """
+
+    def __init__(self, totals):
+        """
+        Args:
+            totals: DataFrame of "sum" and "count" indexed by (type, category), as built by budget_metrics.
+        """
+        self.totals = totals
+        by_type = totals["sum"].groupby(level="type", observed=True).sum()
+        by_category = totals["sum"].groupby(level="category", observed=True).sum()
+
+        self.income = by_type.get("Income", 0)
+        self.expense = by_type.get("Expense", 0)
+        self.savings_debit = by_type.get("Savings Debit", 0)
+        self.savings = by_category.get("Savings", 0)
+        self.physical_investments = by_category.get("Physical Investments", 0)
+        self.stocks = by_category.get("Stocks", 0)
+        self.mutual_funds = by_category.get("Mutual Funds", 0)
+        self.net_balance = self.income - self.expense
+        self.net_savings = self.savings - self.savings_debit
+        self.count = int(totals["count"].sum())
+
+    def percent_of_income(self, amount):
+        """Format an amount as a share of income, e.g. for a metric delta"""
+        return f"{amount / self.income * 100:.1f}%" if self.income > 0 else "0%"
+
+    def type_totals(self):
+        """Return the amount per transaction type as a DataFrame with "type" and "amount" columns"""
+        totals = self.totals["sum"].groupby(level="type", observed=True).sum()
+        return totals.rename("amount").reset_index()
+
+    def category_totals(self, transaction_type=None):
+        """
+        Return the amount per category, largest first, as a DataFrame with "category" and "amount" columns.
+
+        Args:
+            transaction_type: Only count transactions of this type (e.g., "Expense"). If None, counts all.
+        """
+        totals = self.totals["sum"]
+        if transaction_type is not None:
+            types = totals.index.get_level_values("type")
+            totals = totals[types == transaction_type]
+        totals = totals.groupby(level="category", observed=True).sum()
+        return totals.rename("amount").reset_index().sort_values("amount", ascending=False)
+
+
+def budget_metrics(df):
+    """Aggregate transactions into BudgetMetrics with a single groupby over (type, category)"""
+    totals = df.groupby(["type", "category"], observed=True)["amount"].agg(["sum", "count"])
+    return BudgetMetrics(totals)
+
+
+class RollupCube:
+    """
+    Amount sum, count, min and max per (year, month, *dimensions) cell of a dataset.
+
+    Views read their figures and charts from the cells, so rendering costs grow with the
+    number of months and categories rather than with the number of rows. Undated rows
+    are kept in year 0, month 0, so all-time totals still include them.
+    """
+
+    def __init__(self, frame, dimensions=(), version=None):
+        """
+        Args:
+            frame: Typed DataFrame with "date" and "amount" columns, and one column per dimension.
+            dimensions: Columns to break each month down by (e.g., ("type", "category")).
+            version: Dataset version the cube was built from.
+        """
+        self.dimensions = list(dimensions)
+        self.version = version
+        self.cells = self._aggregate(frame)
+
+    def _aggregate(self, frame):
+        dates = frame["date"]
+        keys = [
+            dates.dt.year.fillna(0).astype("int16").rename("year"),
+            dates.dt.month.fillna(0).astype("int8").rename("month"),
+            *(frame[dimension] for dimension in self.dimensions),
+        ]
+        return frame.groupby(keys, observed=True)["amount"].agg(["sum", "count", "min", "max"])
+
+    def update(self, rows, months, version):
+        """
+        Re-aggregate a few months after a local write instead of rebuilding the cube.
+
+        Args:
+            rows: Every row of the dataset now dated in those months.
+            months: (year, month) pairs touched by the write; (0, 0) for undated rows.
+            version: Dataset version after the write.
+        """
+        index = self.cells.index
+        touched = pd.MultiIndex.from_arrays([index.get_level_values("year"), index.get_level_values("month")])
+        kept = self.cells[~touched.isin(list(months))]
+        self.cells = pd.concat([kept, self._aggregate(rows)]).sort_index()
+        self.version = version
+
+    def _select(self, year=None, month=None):
+        cells = self.cells
+        if year is not None:
+            cells = cells[cells.index.get_level_values("year") == year]
+        if month is not None:
+            cells = cells[cells.index.get_level_values("month") == month]
+        return cells
+
+    def totals(self, levels, year=None, month=None):
+        """
+        Roll the cells up to some of their levels.
+
+        Args:
+            levels: Index levels to keep (e.g., ["type", "category"]).
+            year: Only include this year.
+            month: Only include this month number.
+
+        Returns:
+            DataFrame of "sum", "count", "min" and "max" indexed by levels.
+        """
+        cells = self._select(year, month)
+        return cells.groupby(level=levels, observed=True).agg({"sum": "sum", "count": "sum", "min": "min",
+                                                               "max": "max"})
+
+    def summary(self, year=None, month=None):
+        """Return the overall "sum", "count", "min" and "max" of the selected cells as a Series"""
+        cells = self._select(year, month)
+        return pd.Series({"sum": cells["sum"].sum(), "count": int(cells["count"].sum()),
+                          "min": cells["min"].min(), "max": cells["max"].max()})
+
+    def by_month(self, dimension=None, year=None):
+        """
+        Return amount sums per dated month, oldest first, as a DataFrame with a "month" label
+        (e.g., "2026-01"), the dimension when given, and "amount".
+        """
+        levels = ["year", "month", *([dimension] if dimension else [])]
+        sums = self.totals(levels, year=year)["sum"]
+        sums = sums[sums.index.get_level_values("year") > 0].rename("amount").reset_index()
+        sums.insert(0, "label", [f"{y}-{m:02d}" for y, m in zip(sums["year"], sums["month"])])
+        return sums.drop(columns=["year", "month"]).rename(columns={"label": "month"})
+
+    def metrics(self, year=None, month=None):
+        """Return BudgetMetrics of the selected months; needs the ("type", "category") dimensions"""
+        return BudgetMetrics(self.totals(["type", "category"], year, month))
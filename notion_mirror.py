@@ -0,0 +1,281 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from notion_async import query_sources
+from notion_fetch import iter_partitioned, month_partitions, property_ids, query_all
+
+DEFAULT_MIRROR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".notion_cache", "mirror.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    source_id TEXT NOT NULL,
+    page_id TEXT NOT NULL,
+    last_edited TEXT,
+    date TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source_id, page_id)
+);
+CREATE INDEX IF NOT EXISTS pages_by_date ON pages (source_id, date);
+CREATE TABLE IF NOT EXISTS sync_state (
+    source_id TEXT PRIMARY KEY,
+    schema TEXT,
+    watermark TEXT,
+    synced_at TEXT,
+    generation INTEGER
+);
+"""
+
+_sync_locks = {}
+_sync_locks_guard = threading.Lock()
+
+
+def _sync_lock(key):
+    """Return the process-wide lock guarding writes to one mirrored data source"""
+    with _sync_locks_guard:
+        return _sync_locks.setdefault(key, threading.Lock())
+
+
+class NotionMirror:
+    """
+    Local SQLite copy of a Notion data source.
+
+    Rows are kept current with delta syncs: only pages whose last_edited_time is on or
+    after the stored watermark are downloaded, and pages found in the trash are removed
+    as tombstones. The first sync loads the full history as concurrent per-month queries
+    and can be consumed batch by batch while it runs.
+    """
+
+    def __init__(self, client, data_source_id, parse_row, auth=None, properties=None, schema="v1",
+                 path=DEFAULT_MIRROR_PATH):
+        """
+        Args:
+            client: Notion client used for the initial full load.
+            auth: Notion token; when given, delta syncs run their queries concurrently on an AsyncClient.
+            properties: Notion property names read by parse_row; syncs only download these.
+            data_source_id: Notion data source to mirror.
+            parse_row: Turns a Notion page into a row dict with at least "id" and "date".
+            schema: Version tag of parse_row; a change triggers a full resync.
+            path: SQLite file holding the mirror.
+        """
+        self.client = client
+        self.data_source_id = data_source_id
+        self.parse_row = parse_row
+        self.auth = auth
+        self.properties = properties
+        self._projection = None
+        self.schema = schema
+        self.path = path
+        self._lock = _sync_lock((path, data_source_id))
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Mirrors created before the generation counter existed
+            if "generation" not in {column for _, column, *_ in conn.execute("PRAGMA table_info(sync_state)")}:
+                conn.execute("ALTER TABLE sync_state ADD COLUMN generation INTEGER")
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _state(self, conn):
+        row = conn.execute(
+            "SELECT schema, watermark FROM sync_state WHERE source_id = ?", (self.data_source_id,)
+        ).fetchone()
+        if not row or row[0] != self.schema:
+            return None
+        return row[1]
+
+    def _row_values(self, page):
+        row = self.parse_row(page)
+        return (
+            self.data_source_id,
+            page["id"],
+            page.get("last_edited_time"),
+            (row.get("date") or "")[:10] or None,
+            json.dumps(row),
+        )
+
+    def _write(self, conn, pages, removed_ids):
+        """Upsert and delete rows, bumping the generation if that changed any of them"""
+        changes = conn.total_changes
+        # Pages re-fetched unchanged are skipped, so they do not count as a change. Columns are
+        # named, so mirrors created with the former month column still accept rows.
+        conn.executemany(
+            "INSERT INTO pages (source_id, page_id, last_edited, date, data) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (source_id, page_id) DO UPDATE SET "
+            "last_edited = excluded.last_edited, date = excluded.date, data = excluded.data "
+            "WHERE pages.data IS NOT excluded.data OR pages.last_edited IS NOT excluded.last_edited",
+            [self._row_values(p) for p in pages],
+        )
+        conn.executemany(
+            "DELETE FROM pages WHERE source_id = ? AND page_id = ?",
+            [(self.data_source_id, page_id) for page_id in removed_ids],
+        )
+        if conn.total_changes != changes:
+            # Seeded from the clock, so a recreated mirror never reuses an old stamp
+            conn.execute(
+                "INSERT INTO sync_state (source_id, generation) VALUES (?, ?) "
+                "ON CONFLICT (source_id) DO UPDATE SET generation = COALESCE(generation, excluded.generation) + 1",
+                (self.data_source_id, time.time_ns()),
+            )
+
+    def apply_all(self, pages):
+        """
+        Write pages returned by pages.create / pages.update straight into the mirror, in one transaction.
+
+        Archived or trashed pages are removed, anything else is upserted. The watermark is
+        left alone, so the next delta sync still re-reads the pages from Notion.
+
+        Returns:
+            (rows, removed, before, after): the parsed rows of the pages, the ids of the pages
+            removed, and the mirror version just before and just after the write.
+        """
+        removed = [p["id"] for p in pages if p.get("in_trash") or p.get("archived")]
+        live = [p for p in pages if not (p.get("in_trash") or p.get("archived"))]
+        with self._lock, self._connect() as conn:
+            before = self._version(conn)
+            self._write(conn, live, removed)
+            after = self._version(conn)
+        return [self.parse_row(p) for p in pages], removed, before, after
+
+    def _query_params(self, **params):
+        """Add the property projection to a query, resolving property IDs on first use"""
+        if self.properties and self._projection is None:
+            self._projection = property_ids(self.client, self.data_source_id, self.properties)
+        if self._projection:
+            params["filter_properties"] = self._projection
+        return params
+
+    def query(self, filter=None):
+        """Fetch the pages matching a Notion filter straight from Notion, projected like syncs"""
+        params = {"filter": filter} if filter else {}
+        return query_all(self.client, self.data_source_id, **self._query_params(**params))
+
+    def _delta(self, edited_since):
+        """Fetch live and trashed pages edited since the watermark"""
+        if not self.auth:
+            pages = query_all(self.client, self.data_source_id, **self._query_params(filter=edited_since))
+            return pages + query_all(
+                self.client, self.data_source_id, **self._query_params(filter=edited_since, in_trash=True)
+            )
+
+        results = query_sources({
+            "edited": {
+                "auth": self.auth,
+                "data_source_id": self.data_source_id,
+                "params": self._query_params(filter=edited_since),
+            },
+            "trashed": {
+                "auth": self.auth,
+                "data_source_id": self.data_source_id,
+                "params": self._query_params(filter=edited_since, in_trash=True),
+            },
+        })
+        return results["edited"] + results["trashed"]
+
+    def is_warm(self):
+        """Whether the mirror already holds a full load, so syncs only fetch deltas"""
+        with self._connect() as conn:
+            return self._state(conn) is not None
+
+    def version(self):
+        """
+        Stamp identifying the mirror's current contents.
+
+        It is the generation counter bumped by every sync or write that adds, edits or
+        removes a row, so copies built from the mirror can tell whether they are still current.
+        """
+        with self._connect() as conn:
+            return self._version(conn)
+
+    def _version(self, conn):
+        row = conn.execute(
+            "SELECT generation FROM sync_state WHERE source_id = ?", (self.data_source_id,)
+        ).fetchone()
+        return f"{self.schema}:{row[0] if row else None}"
+
+    def iter_sync(self):
+        """
+        Bring the mirror up to date with Notion, yielding each batch of live pages as it lands.
+
+        Batches are written to the mirror as they arrive. The watermark only moves once the
+        whole sync has finished, so an interrupted full load is simply redone next time. The
+        sync lock is only held while a batch or the watermark is written, never across a
+        yield, so saves and imports are not held up by a long first load.
+        """
+        with self._connect() as conn:
+            watermark = self._state(conn)
+            existing = {page_id for (page_id,) in conn.execute(
+                "SELECT page_id FROM pages WHERE source_id = ?", (self.data_source_id,)
+            )} if not watermark else set()
+
+        if watermark:
+            edited_since = {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": watermark},
+            }
+            batches = [self._delta(edited_since)]
+        else:
+            batches = iter_partitioned(
+                self.client, self.data_source_id, month_partitions(), **self._query_params()
+            )
+
+        edited = [watermark] if watermark else []
+        fetched = set()
+        for pages in batches:
+            live = [p for p in pages if not (p.get("in_trash") or p.get("archived"))]
+            removed = [p["id"] for p in pages if p.get("in_trash") or p.get("archived")]
+            edited += [p["last_edited_time"] for p in pages if p.get("last_edited_time")]
+            fetched.update(p["id"] for p in live)
+
+            with self._lock, self._connect() as conn:
+                self._write(conn, live, removed)
+            if live:
+                yield live
+
+        with self._lock, self._connect() as conn:
+            # A full load replaces the source: drop rows Notion no longer returned
+            self._write(conn, [], existing - fetched)
+            conn.execute(
+                "INSERT INTO sync_state (source_id, schema, watermark, synced_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (source_id) DO UPDATE SET schema = excluded.schema, "
+                "watermark = excluded.watermark, synced_at = excluded.synced_at",
+                (self.data_source_id, self.schema, max(edited, default=None),
+                 datetime.now(timezone.utc).isoformat()),
+            )
+
+    def sync(self):
+        """Bring the mirror up to date with Notion"""
+        for _ in self.iter_sync():
+            pass
+
+    @staticmethod
+    def _column(field):
+        """SQL expression reading one row field"""
+        return "date" if field == "date" else f"json_extract(data, '$.{field}')"
+
+    def records(self, fields):
+        """
+        Read mirrored rows as (id, *fields) tuples, newest first, without building row dicts.
+
+        Args:
+            fields: Row fields to read, in tuple order.
+        """
+        columns = ", ".join(self._column(field) for field in fields)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT page_id, {columns} FROM pages WHERE source_id = ? ORDER BY date DESC, page_id",
+                (self.data_source_id,),
+            ).fetchall()
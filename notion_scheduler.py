@@ -0,0 +1,196 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import httpx
+from notion_client import AsyncClient, Client
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+# Notion allows an average of three requests per second per integration
+REQUESTS_PER_SECOND = 3
+BURST = 3
+MAX_RETRIES = 5
+BASE_DELAY = 0.5
+MAX_DELAY = 30
+
+# Rate limited, conflicting write, or a transient server error: safe to try again
+RETRY_STATUSES = {409, 429, 500, 502, 503, 504}
+# Statuses that prove Notion did not apply a request, so even a create can be resent
+REJECTED_STATUSES = {409, 429}
+
+
+class TokenBucket:
+    """Thread-safe token bucket handing out request slots at a steady rate"""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """Take one slot, returning how many seconds the caller must wait before using it"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def pause(self, seconds):
+        """Hold back every caller that reserves a slot within the next few seconds, e.g., after a 429"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+
+class RequestScheduler:
+    """
+    Run Notion requests within the rate limit, retrying rate-limited and transient failures.
+
+    Every request first waits for a token bucket slot. A 429 pauses the whole bucket for
+    the Retry-After the API asked for, so parallel callers back off together; other
+    retryable errors wait an exponentially growing, jittered delay. Requests that are not
+    idempotent, such as page creates, are only resent after a 429 or 409: after a timeout
+    or server error Notion may already have applied them, and a resend could duplicate them.
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=BURST, max_retries=MAX_RETRIES,
+                 base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def retryable(error, idempotent=True):
+        """Whether a failed request is worth sending again"""
+        if not idempotent:
+            return isinstance(error, HTTPResponseError) and error.status in REJECTED_STATUSES
+        if isinstance(error, (RequestTimeoutError, httpx.TransportError)):
+            return True
+        return isinstance(error, HTTPResponseError) and error.status in RETRY_STATUSES
+
+    def retry_delay(self, error, attempt):
+        """Seconds to wait before retry number attempt, honoring Retry-After when present"""
+        retry_after = getattr(error, "headers", {}).get("Retry-After")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+                self.bucket.pause(delay)
+                return delay + random.uniform(0, self.base_delay)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _started(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _finished(self, failed):
+        with self._lock:
+            self.in_flight -= 1
+            self.retries += failed
+
+    def call(self, request, *args, idempotent=True, **kwargs):
+        """Send a blocking request, waiting for a slot and retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self.bucket.reserve())
+            self._started()
+            retry = False
+            try:
+                return request(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not self.retryable(e, idempotent):
+                    raise
+                retry = True
+                delay = self.retry_delay(e, attempt)
+            finally:
+                self._finished(retry)
+            time.sleep(delay)
+
+    async def acall(self, request, *args, idempotent=True, **kwargs):
+        """Await a request coroutine, waiting for a slot and retrying transient failures"""
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self.bucket.reserve())
+            self._started()
+            retry = False
+            try:
+                return await request(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not self.retryable(e, idempotent):
+                    raise
+                retry = True
+                delay = self.retry_delay(e, attempt)
+            finally:
+                self._finished(retry)
+            await asyncio.sleep(delay)
+
+
+_schedulers = {}
+_schedulers_guard = threading.Lock()
+
+
+def scheduler_for(auth):
+    """Return the process-wide scheduler for one Notion token; the rate limit is per integration"""
+    with _schedulers_guard:
+        return _schedulers.setdefault(auth, RequestScheduler())
+
+
+def map_concurrently(request, items, max_workers=BURST):
+    """
+    Call request(item) for every item on a small thread pool, yielding (item, result, error)
+    as each call finishes.
+
+    The scheduler of the client inside request still paces the calls, so the pool only
+    needs to be large enough to keep the token bucket busy. Errors are yielded rather than
+    raised, so one failed item does not stop the rest.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(request, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+
+def is_idempotent(path, method):
+    """Whether a Notion request can be sent twice safely; POSTs create, except queries and search"""
+    return method.upper() != "POST" or path == "search" or path.endswith("/query")
+
+
+def _request_target(args, kwargs):
+    """Pull (path, method) out of the arguments of Client.request"""
+    path = kwargs["path"] if "path" in kwargs else args[0]
+    method = kwargs["method"] if "method" in kwargs else args[1]
+    return path, method
+
+
+class ScheduledClient(Client):
+    """Notion client whose every request goes through the scheduler of its token"""
+
+    def request(self, *args, **kwargs):
+        return scheduler_for(self.options.auth).call(
+            super().request, *args, idempotent=is_idempotent(*_request_target(args, kwargs)), **kwargs
+        )
+
+
+class ScheduledAsyncClient(AsyncClient):
+    """Async Notion client whose every request goes through the scheduler of its token"""
+
+    async def request(self, *args, **kwargs):
+        return await scheduler_for(self.options.auth).acall(
+            super().request, *args, idempotent=is_idempotent(*_request_target(args, kwargs)), **kwargs
+        )
@@ -0,0 +1,74 @@
+def rich_text(prop, default=""):
+    """Read the first text run of a rich_text property"""
+    return prop["rich_text"][0]["text"]["content"] if prop["rich_text"] else default
+
+
+def date_start(prop):
+    """Read the start of a date property as an ISO string"""
+    return prop["date"]["start"] if prop["date"] else None
+
+
+def select_name(prop, default="Unknown"):
+    """Read the option name of a select property"""
+    return prop["select"]["name"] if prop["select"] else default
+
+
+def number(prop):
+    """Read a number property, treating empty as 0"""
+    return prop["number"] if prop["number"] else 0
+
+
+def known_text(prop):
+    return rich_text(prop, "Unknown")
+
+
+# Row field -> (Notion property name, reader)
+TRANSACTION_SCHEMA = {
+    "date": ("Date", date_start),
+    "time": ("Time", known_text),
+    "type": ("Type", select_name),
+    "category": ("Category", known_text),
+    "amount": ("Amount", number),
+    "month": ("Month", known_text),
+    "description": ("Description", rich_text),
+}
+
+RIDE_SCHEMA = {
+    "date": ("Date", date_start),
+    "time": ("Time", known_text),
+    "amount": ("Amount", number),
+    "month": ("Month", known_text),
+}
+
+
+def notion_properties(schema, fields=None):
+    """Return the Notion property names backing the given row fields (all fields if None)"""
+    return [schema[field][0] for field in fields or schema]
+
+
+def parse_page(page, schema, fields=None):
+    """
+    Turn a Notion page into a row dict.
+
+    Args:
+        page: Page object from data_sources.query or pages.create/update.
+        schema: Mapping of row field to (property name, reader).
+        fields: Row fields to read. If None, reads every field of the schema.
+    """
+    props = page["properties"]
+    row = {"id": page["id"]}
+    for field in fields or schema:
+        name, read = schema[field]
+        row[field] = read(props[name])
+    return row
+
+
+def parse_transaction(page):
+    """Turn a Notion page into a transaction dict"""
+    return parse_page(page, TRANSACTION_SCHEMA)
+
+
+def parse_ride(page):
+    """Turn a Notion page into a ride dict"""
+    return parse_page(page, RIDE_SCHEMA)
+
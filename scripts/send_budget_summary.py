@@ -1,66 +1,43 @@
 import os
-from notion_client import Client
-from datetime import datetime
+import sys
+from datetime import datetime, timedelta
 import calendar
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from notion_async import iter_rows
+from notion_filters import date_range_filter, month_range
+from notion_schema import TRANSACTION_SCHEMA, notion_properties, parse_page
 
 
-notion = Client(auth=os.environ["NOTION_TOKEN"])
+notion_token = os.environ["NOTION_TOKEN"]
 datasource_id = os.environ["NOTION_DATASOURCE_ID"]
 
+# Only the properties the summary reads are requested from Notion
+SUMMARY_FIELDS = ["date", "type", "category", "amount", "description"]
 
 
 
-def get_all_transactions(month=None):
-    """Fetch transactions from Notion with optional Month filter + pagination"""
 
-    transactions = []
-    has_more = True
-    start_cursor = None
+def iter_transactions(start=None, end=None):
+    """Stream transactions from Notion with an optional inclusive Date range, as each response lands"""
 
-    base_params = {
-        "data_source_id": datasource_id
-    }
-
-    if month:
-        base_params["filter"] = {
-            "property": "Month",
-            "rich_text": {
-                "equals": month
-            }
-        }
-
-    while has_more:
-
-        params = base_params.copy()
-
-        if start_cursor:
-            params["start_cursor"] = start_cursor
-
-        data = notion.data_sources.query(**params)
+    params = {}
 
-        for row in data["results"]:
-            props = row["properties"]
+    date_filter = date_range_filter(start, end)
+    if date_filter:
+        params["filter"] = date_filter
 
-            transactions.append({
-                "id": row["id"],
-                "date": props["Date"]["date"]["start"] if props["Date"]["date"] else None,
-                "time": props["Time"]["rich_text"][0]["text"]["content"] if props["Time"]["rich_text"] else "Unknown",
-                "type": props["Type"]["select"]["name"] if props["Type"]["select"] else "Unknown",
-                "category": props["Category"]["rich_text"][0]["text"]["content"] if props["Category"]["rich_text"] else "Unknown",
-                "amount": props["Amount"]["number"] or 0,
-                "month": props["Month"]["rich_text"][0]["text"]["content"] if props["Month"]["rich_text"] else "Unknown",
-                "description": props["Description"]["rich_text"][0]["text"]["content"] if props["Description"]["rich_text"] else ""
-            })
-
-        has_more = data.get("has_more", False)
-        start_cursor = data.get("next_cursor")
-
-    return transactions
+    return iter_rows(
+        notion_token,
+        datasource_id,
+        lambda row: parse_page(row, TRANSACTION_SCHEMA, SUMMARY_FIELDS),
+        properties=notion_properties(TRANSACTION_SCHEMA, SUMMARY_FIELDS),
+        **params
+    )
 
 
 
@@ -80,35 +57,54 @@ def get_previous_month_name():
 
 
 
-def get_previous_month_summary():
-    """Generate financial summary for previous month"""
+def get_previous_month_range():
+    """Return the first and last date of the previous month"""
 
-    prev_month = get_previous_month_name()
+    first_of_this_month = datetime.now().date().replace(day=1)
+    last_of_prev_month = first_of_this_month - timedelta(days=1)
 
-    transactions = get_all_transactions(month=prev_month)
+    return month_range(last_of_prev_month.year, last_of_prev_month.month)
 
-    if not transactions:
-        return None
 
-    income = [t for t in transactions if t["type"] == "Income"]
-    expenses = [t for t in transactions if t["type"] == "Expense"]
 
-    total_income = sum(t["amount"] for t in income)
-    total_expenses = sum(t["amount"] for t in expenses)
-    total_savings = sum(t["amount"] for t in expenses if t["category"] == "Savings")
-    net_balance = total_income - total_expenses
+def get_previous_month_summary():
+    """Generate financial summary for previous month"""
 
+    prev_month = get_previous_month_name()
+
+    row_count = 0
+    total_income = 0
+    total_expenses = 0
+    total_savings = 0
+    income_count = 0
+    expense_count = 0
     income_by_category = {}
     expense_by_category = {}
+    biggest_expense = None
+    biggest_income = None
+
+    # One pass over the rows as they stream in; nothing is kept but the running totals
+    for t in iter_transactions(*get_previous_month_range()):
+        row_count += 1
+        if t["type"] == "Income":
+            total_income += t["amount"]
+            income_count += 1
+            income_by_category[t["category"]] = income_by_category.get(t["category"], 0) + t["amount"]
+            if biggest_income is None or t["amount"] > biggest_income["amount"]:
+                biggest_income = t
+        elif t["type"] == "Expense":
+            total_expenses += t["amount"]
+            expense_count += 1
+            expense_by_category[t["category"]] = expense_by_category.get(t["category"], 0) + t["amount"]
+            if t["category"] == "Savings":
+                total_savings += t["amount"]
+            if biggest_expense is None or t["amount"] > biggest_expense["amount"]:
+                biggest_expense = t
+
+    if not row_count:
+        return None
 
-    for t in income:
-        income_by_category[t["category"]] = income_by_category.get(t["category"], 0) + t["amount"]
-
-    for t in expenses:
-        expense_by_category[t["category"]] = expense_by_category.get(t["category"], 0) + t["amount"]
-
-    biggest_expense = max(expenses, key=lambda x: x["amount"], default=None)
-    biggest_income = max(income, key=lambda x: x["amount"], default=None)
+    net_balance = total_income - total_expenses
 
     most_common_expense_category = (
         max(expense_by_category, key=expense_by_category.get)
@@ -121,8 +117,8 @@ def get_previous_month_summary():
         "total_expenses": total_expenses,
         "total_savings": total_savings,
         "net_balance": net_balance,
-        "income_count": len(income),
-        "expense_count": len(expenses),
+        "income_count": income_count,
+        "expense_count": expense_count,
         "income_by_category": income_by_category,
         "expense_by_category": expense_by_category,
         "biggest_expense": biggest_expense,
@@ -1,62 +1,41 @@
 import os
-from notion_client import Client
-from datetime import datetime
+import sys
+from datetime import datetime, timedelta
 import calendar
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from notion_async import iter_rows
+from notion_filters import date_range_filter, month_range
+from notion_schema import RIDE_SCHEMA, notion_properties, parse_page
 
-notion = Client(auth=os.environ["NOTION_TOKEN"])
-datasource_id = os.environ["NOTION_DATASOURCE_ID"]
-
-
-
-def get_all_rides(month=None):
-    """Fetch rides from Notion with optional Month filter + pagination"""
-
-    rides = []
-    has_more = True
-    start_cursor = None
-
-    base_params = {
-        "data_source_id": datasource_id
-    }
-
-
-    if month:
-        base_params["filter"] = {
-            "property": "Month",
-            "rich_text": {
-                "equals": month
-            }
-        }
 
-    while has_more:
-
-        params = base_params.copy()
+notion_token = os.environ["NOTION_TOKEN"]
+datasource_id = os.environ["NOTION_DATASOURCE_ID"]
 
-        if start_cursor:
-            params["start_cursor"] = start_cursor
+# Only the properties the summary reads are requested from Notion
+SUMMARY_FIELDS = ["date", "time", "amount"]
 
-        data = notion.data_sources.query(**params)
 
-        for row in data["results"]:
-            props = row["properties"]
+def iter_rides(start=None, end=None):
+    """Stream rides from Notion with an optional inclusive Date range, as each response lands"""
 
-            rides.append({
-                "id": row["id"],
-                "date": props["Date"]["date"]["start"] if props["Date"]["date"] else None,
-                "time": props["Time"]["rich_text"][0]["text"]["content"] if props["Time"]["rich_text"] else "Unknown",
-                "amount": props["Amount"]["number"] or 0,
-                "month": props["Month"]["rich_text"][0]["text"]["content"] if props["Month"]["rich_text"] else "Unknown"
-            })
+    params = {}
 
-        has_more = data.get("has_more", False)
-        start_cursor = data.get("next_cursor")
+    date_filter = date_range_filter(start, end)
+    if date_filter:
+        params["filter"] = date_filter
 
-    return rides
+    return iter_rows(
+        notion_token,
+        datasource_id,
+        lambda row: parse_page(row, RIDE_SCHEMA, SUMMARY_FIELDS),
+        properties=notion_properties(RIDE_SCHEMA, SUMMARY_FIELDS),
+        **params
+    )
 
 
 
@@ -76,27 +55,41 @@ def get_previous_month_name():
 
 
 
-def get_previous_month_summary():
-    """Generate ride summary for previous month (filtered at source)"""
+def get_previous_month_range():
+    """Return the first and last date of the previous month"""
 
-    prev_month = get_previous_month_name()
+    first_of_this_month = datetime.now().date().replace(day=1)
+    last_of_prev_month = first_of_this_month - timedelta(days=1)
 
-    rides = get_all_rides(month=prev_month)
+    return month_range(last_of_prev_month.year, last_of_prev_month.month)
 
-    if not rides:
-        return None
 
-    total_spent = sum(r["amount"] for r in rides)
-    total_rides = len(rides)
-    avg_cost = total_spent / total_rides if total_rides > 0 else 0
 
-    most_expensive = max(rides, key=lambda x: x["amount"], default=None)
-    cheapest = min(rides, key=lambda x: x["amount"], default=None)
+def get_previous_month_summary():
+    """Generate ride summary for previous month (filtered at source)"""
 
+    prev_month = get_previous_month_name()
+
+    total_spent = 0
+    total_rides = 0
+    most_expensive = None
+    cheapest = None
     time_breakdown = {}
 
-    for r in rides:
+    # One pass over the rides as they stream in; nothing is kept but the running totals
+    for r in iter_rides(*get_previous_month_range()):
+        total_spent += r["amount"]
+        total_rides += 1
         time_breakdown[r["time"]] = time_breakdown.get(r["time"], 0) + 1
+        if most_expensive is None or r["amount"] > most_expensive["amount"]:
+            most_expensive = r
+        if cheapest is None or r["amount"] < cheapest["amount"]:
+            cheapest = r
+
+    if not total_rides:
+        return None
+
+    avg_cost = total_spent / total_rides
 
     most_common_time = (
         max(time_breakdown, key=time_breakdown.get)